@@ -0,0 +1,103 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import itertools
+import os
+import time
+
+from cargas import Carga, distribucion, llegadas
+from motor_simulacion import MotorSimulacion
+from politicas import POLITICAS
+
+
+VIDAS = "uniforme:1:50"
+INTERVALOS = "uniforme:0:2"
+
+
+def tamanos_por_defecto(tamano_total):
+    # Tamaños hasta una octava parte de la memoria
+    return f"uniforme:1:{max(tamano_total // 8, 1)}"
+
+
+def generar_carga(semilla, num_procesos, tamano_total, tamanos=None, vidas=VIDAS, intervalos=INTERVALOS):
+    # Eventos sintéticos reproducibles: solo dependen de la semilla, nunca del estado global de random
+    tamanos = distribucion(tamanos or tamanos_por_defecto(tamano_total))
+    carga = Carga(tamanos, distribucion(vidas), llegadas(intervalos), semilla=semilla)
+    return carga.eventos(num_procesos)
+
+
+def ejecutar_punto(punto):
+    # Una simulación independiente del barrido; debe poder enviarse a otro proceso
+    tamano_total, tamano_pagina, politica, semilla, num_procesos, carga = punto
+    # La carga que se usa de verdad, con los valores por defecto escritos, para la columna "carga"
+    carga = dict({"tamanos": tamanos_por_defecto(tamano_total), "vidas": VIDAS, "intervalos": INTERVALOS},
+                 **{clave: valor for clave, valor in carga.items() if valor is not None})
+    motor = MotorSimulacion(tamano_total, tamano_pagina, compacta=True, max_historial=1, politica=politica)
+    inicio = time.perf_counter()
+    motor.ejecutar(generar_carga(semilla, num_procesos, tamano_total, **carga))
+    transcurrido = time.perf_counter() - inicio
+
+    resultado = {
+        "tamano_total": tamano_total,
+        "tamano_pagina": tamano_pagina,
+        "semilla": semilla,
+        "carga": " ".join(f"{clave}={valor}" for clave, valor in carga.items()),
+        "tiempo_ejecucion_s": transcurrido,
+        "tramos_libres": sum(motor.memoria.histograma_huecos().values()),
+    }
+    resultado.update(motor.estadisticas())
+    return resultado
+
+
+def barrido(tamanos_memoria, tamanos_pagina, politicas, semillas, num_procesos=2000, trabajadores=None, carga=None):
+    # Resultados en el mismo orden que la rejilla, sea cual sea el proceso que los calculó.
+    # carga: especificaciones de cargas.py para generar_carga (tamanos, vidas, intervalos)
+    carga = carga or {}
+    puntos = [(tamano_total, tamano_pagina, politica, semilla, num_procesos, carga)
+              for tamano_total, tamano_pagina, politica, semilla
+              in itertools.product(tamanos_memoria, tamanos_pagina, politicas, semillas)
+              if tamano_pagina <= tamano_total]
+    if trabajadores == 1:
+        return [ejecutar_punto(punto) for punto in puntos]
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        return list(ejecutor.map(ejecutar_punto, puntos, chunksize=max(len(puntos) // (4 * (os.cpu_count() or 1)), 1)))
+
+
+def guardar_resultados(resultados, ruta):
+    if ruta.endswith(".parquet"):
+        try:
+            import pandas as pd
+            pd.DataFrame(resultados).to_parquet(ruta, index=False)
+        except ImportError:
+            raise ValueError("Para guardar en Parquet hace falta pandas y pyarrow o fastparquet.")
+        return
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=list(resultados[0]) if resultados else [])
+        escritor.writeheader()
+        escritor.writerows(resultados)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barrido de configuraciones de la memoria paginada en paralelo")
+    parser.add_argument("--memorias", type=int, nargs="+", default=[4096, 16384], help="Tamaños totales de memoria (bytes)")
+    parser.add_argument("--paginas", type=int, nargs="+", default=[4, 16, 64], help="Tamaños de página (bytes)")
+    parser.add_argument("--politicas", nargs="+", choices=list(POLITICAS), default=list(POLITICAS))
+    parser.add_argument("--semillas", type=int, default=3, help="Número de semillas de carga (0, 1, ...)")
+    parser.add_argument("--procesos", type=int, default=2000, help="Procesos por simulación")
+    parser.add_argument("--tamanos", help="Distribución de tamaños (por defecto, uniforme hasta 1/8 de la memoria)")
+    parser.add_argument("--vidas", default=VIDAS, help="Distribución de tiempos de vida")
+    parser.add_argument("--intervalos", default=INTERVALOS, help="Llegadas: poisson:tasa, fases:... o distribución de intervalos")
+    parser.add_argument("--trabajadores", type=int, help="Procesos en paralelo (por defecto, todos los núcleos)")
+    parser.add_argument("--salida", default="barrido.csv", help="Archivo de resultados (.csv o .parquet)")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resultados = barrido(args.memorias, args.paginas, args.politicas, range(args.semillas),
+                         args.procesos, args.trabajadores,
+                         {"tamanos": args.tamanos, "vidas": args.vidas, "intervalos": args.intervalos})
+    guardar_resultados(resultados, args.salida)
+    print(f"{len(resultados)} simulaciones en {time.perf_counter() - inicio:.2f} s -> {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import random
+import time
+import tracemalloc
+
+from memoria import Memoria, Proceso
+from politicas import POLITICAS
+
+
+def medir_asignacion(num_marcos, paginas_por_proceso=8, operaciones=20000, tamano_pagina=4, compacta=False):
+    memoria = Memoria(num_marcos * tamano_pagina, tamano_pagina, compacta)
+    tamano = paginas_por_proceso * tamano_pagina
+
+    # Llenar la mitad de la memoria para que las asignaciones no partan de cero
+    residentes = []
+    for i in range(num_marcos // (2 * paginas_por_proceso)):
+        proceso = Proceso(i, tamano)
+        memoria.asignar_memoria(proceso)
+        residentes.append(proceso)
+
+    siguiente_id = len(residentes)
+    inicio = time.perf_counter()
+    for i in range(operaciones):
+        # Liberar un residente y asignar uno nuevo en su lugar
+        victima = residentes[i % len(residentes)] if residentes else None
+        if victima is not None:
+            memoria.desasignar_memoria(victima)
+        proceso = Proceso(siguiente_id, tamano)
+        siguiente_id += 1
+        memoria.asignar_memoria(proceso)
+        if victima is not None:
+            residentes[i % len(residentes)] = proceso
+        else:
+            residentes.append(proceso)
+    transcurrido = time.perf_counter() - inicio
+    return transcurrido / operaciones
+
+
+def medir_huella(num_marcos, paginas_por_proceso=8, tamano_pagina=4, compacta=False):
+    # Bytes ocupados por la memoria llena, sin contar el historial de asignaciones
+    tracemalloc.start()
+    memoria = Memoria(num_marcos * tamano_pagina, tamano_pagina, compacta)
+    for i in range(num_marcos // paginas_por_proceso):
+        memoria.asignar_memoria(Proceso(i, paginas_por_proceso * tamano_pagina))
+    memoria.historial_asignaciones.limpiar()
+    usados = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return usados
+
+
+def comparar_politicas(num_marcos, operaciones=20000, tamano_pagina=4, semilla=0):
+    # Misma carga aleatoria para cada política: procesos de tamaño variable que entran y salen
+    resultados = {}
+    for politica in POLITICAS:
+        generador = random.Random(semilla)
+        memoria = Memoria(num_marcos * tamano_pagina, tamano_pagina, politica=politica)
+        residentes = []
+        for i in range(operaciones):
+            if residentes and generador.random() < 0.45:
+                memoria.desasignar_memoria(residentes.pop(generador.randrange(len(residentes))))
+            else:
+                proceso = Proceso(i, generador.randint(1, num_marcos // 16) * tamano_pagina - generador.randint(0, tamano_pagina - 1))
+                if memoria.asignar_memoria(proceso)[0]:
+                    residentes.append(proceso)
+        resultados[politica] = memoria.metricas.resumen()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark de asignación de memoria paginada")
+    parser.add_argument("--max-marcos", type=int, default=2 ** 20)
+    parser.add_argument("--paginas-por-proceso", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=20000)
+    parser.add_argument("--compacta", action="store_true", help="Usar la representación compacta de Memoria")
+    parser.add_argument("--huella", action="store_true", help="Comparar la memoria ocupada por ambas representaciones")
+    parser.add_argument("--politicas", action="store_true", help="Comparar las políticas de ubicación con la misma carga")
+    args = parser.parse_args()
+
+    if args.politicas:
+        print(f"{'política':>18} {'admisión':>9} {'frag. interna (B)':>18} {'tramos/asig.':>13} {'us/asig.':>9}")
+        for politica, resumen in comparar_politicas(min(args.max_marcos, 2 ** 14), args.operaciones).items():
+            print(f"{politica:>18} {resumen['tasa_admision']:>9.3f} {resumen['fragmentacion_interna_media']:>18.1f} "
+                  f"{resumen['tramos_por_asignacion']:>13.2f} {resumen['latencia_media_us']:>9.2f}")
+        return
+
+    if args.huella:
+        print(f"{'marcos':>10} {'lista (B/marco)':>16} {'compacta (B/marco)':>19}")
+        num_marcos = 2 ** 10
+        while num_marcos <= args.max_marcos:
+            lista = medir_huella(num_marcos, args.paginas_por_proceso)
+            compacta = medir_huella(num_marcos, args.paginas_por_proceso, compacta=True)
+            print(f"{num_marcos:>10} {lista / num_marcos:>16.2f} {compacta / num_marcos:>19.2f}")
+            num_marcos *= 4
+        return
+
+    print(f"{'marcos':>10} {'us/op (desasignar + asignar)':>30}")
+    num_marcos = 2 ** 10
+    while num_marcos <= args.max_marcos:
+        por_operacion = medir_asignacion(num_marcos, args.paginas_por_proceso, args.operaciones, compacta=args.compacta)
+        print(f"{num_marcos:>10} {por_operacion * 1e6:>30.2f}")
+        num_marcos *= 4
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from benchmark_memoria import medir_asignacion
+from motor_simulacion import MotorSimulacion
+
+
+# Banco de pruebas de rendimiento. Cada prueba recibe un tamaño (marcos o procesos),
+# prepara su estado fuera de la medición y devuelve los segundos de la parte medida.
+# Los resultados se guardan por commit y se comparan con los de un commit anterior.
+
+
+class PruebaOmitida(Exception):
+    # Falta una dependencia opcional (dash, matplotlib...): la prueba no se ejecuta
+    pass
+
+
+def prueba_asignacion(num_marcos):
+    return medir_asignacion(num_marcos, operaciones=5000)
+
+
+def prueba_asignacion_compacta(num_marcos):
+    return medir_asignacion(num_marcos, operaciones=5000, compacta=True)
+
+
+def prueba_vencimientos(num_procesos):
+    # Procesos de una página con vidas aleatorias; se mide avanzar el tiempo hasta que vencen todos
+    aleatorio = random.Random(0)
+    motor = MotorSimulacion(num_procesos * 4, 4, compacta=True, max_historial=1)
+    for i in range(num_procesos):
+        motor.crear_proceso(i, 4, aleatorio.randint(1, 1000))
+    inicio = time.perf_counter()
+    while motor.procesos:
+        motor.avanzar_tiempo(10)
+    return time.perf_counter() - inicio
+
+
+def sesion_panel(num_procesos):
+    try:
+        import multiprogramacion
+    except ImportError as error:
+        raise PruebaOmitida(f"falta {error.name}")
+    sesion = multiprogramacion.SimulationSession(total_memory=20 * num_procesos)
+    for _ in range(num_procesos):
+        sesion.admit(multiprogramacion.generate_process(sesion))
+    multiprogramacion.sessions.guardar("benchmark", sesion)
+    return multiprogramacion, sesion
+
+
+def peticion_panel(multiprogramacion, cliente, disparador, version_vista):
+    # Petición del navegador al callback update_dashboard, con los controles en sus valores iniciales
+    salida, callback = next(iter(multiprogramacion.app.callback_map.items()))
+    valores = {"session-id": "benchmark", "dashboard-version": version_vista, "process-table": 0}
+    cuerpo = {
+        "output": salida,
+        "outputs": [{"id": clave.split(".")[0], "property": clave.split(".")[1]}
+                    for clave in salida.strip(".").split("...")],
+        "inputs": [dict(entrada, value=valores.get(entrada["id"])) for entrada in callback["inputs"]],
+        "state": [dict(estado, value=valores.get(estado["id"])) for estado in callback["state"]],
+        "changedPropIds": [disparador],
+    }
+    respuesta = cliente.post("/_dash-update-component", json=cuerpo)
+    if respuesta.status_code != 200:
+        raise RuntimeError(f"update_dashboard respondió {respuesta.status_code}")
+    return respuesta.get_json()["response"]
+
+
+def prueba_panel_completo(num_procesos):
+    # Primera carga de una pestaña: se envían todas las salidas
+    multiprogramacion, _ = sesion_panel(num_procesos)
+    cliente = multiprogramacion.app.server.test_client()
+    inicio = time.perf_counter()
+    peticion_panel(multiprogramacion, cliente, "interval-update.n_intervals", None)
+    return time.perf_counter() - inicio
+
+
+def prueba_panel_tick(num_procesos):
+    # Refresco del intervalo tras un tick del planificador: solo cambian algunos valores
+    multiprogramacion, sesion = sesion_panel(num_procesos)
+    cliente = multiprogramacion.app.server.test_client()
+    version = peticion_panel(multiprogramacion, cliente, "interval-update.n_intervals", None)["dashboard-version"]["data"]
+    sesion = multiprogramacion.sessions.obtener("benchmark")
+    sesion.planificador.avanzar(1)
+    multiprogramacion.sessions.guardar("benchmark", sesion)
+    inicio = time.perf_counter()
+    peticion_panel(multiprogramacion, cliente, "interval-update.n_intervals", version)
+    return time.perf_counter() - inicio
+
+
+def vista_memoria(num_marcos):
+    # SimulacionApp sin ventana: sus métodos de dibujo sobre un lienzo Agg
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from memoria_paginada import SimulacionApp
+    except ImportError as error:
+        raise PruebaOmitida(f"falta {error.name}")
+    vista = SimulacionApp.__new__(SimulacionApp)
+    vista.motor = MotorSimulacion(num_marcos * 4, 4, compacta=True, max_historial=1)
+    vista.memoria = vista.motor.memoria
+    vista.cambios = vista.memoria.nuevo_rastreador()
+    vista.colores_procesos = {}
+    vista.fig = Figure()
+    vista.ax1 = vista.fig.add_subplot(1, 1, 1)
+    vista.canvas = FigureCanvasAgg(vista.fig)
+    for i in range(num_marcos // 16):
+        vista.motor.crear_proceso(i, 32)  # Media memoria ocupada, en bloques de 8 páginas
+    return vista
+
+
+def prueba_render_completo(num_marcos):
+    vista = vista_memoria(num_marcos)
+    inicio = time.perf_counter()
+    vista.actualizar_artistas()
+    vista.canvas.draw()
+    return time.perf_counter() - inicio
+
+
+def prueba_render_cambios(num_marcos):
+    # Redibujo tras liberar y asignar un proceso, con los artistas ya creados
+    vista = vista_memoria(num_marcos)
+    vista.actualizar_artistas()
+    vista.canvas.draw()
+    vista.motor.eliminar_proceso(0)
+    vista.motor.crear_proceso(num_marcos, 32)
+    inicio = time.perf_counter()
+    vista.actualizar_artistas()
+    vista.canvas.draw()
+    return time.perf_counter() - inicio
+
+
+# nombre -> (función, tamaños); el tamaño son marcos o procesos según la prueba.
+# Hasta MAX_PAGINAS_ETIQUETADAS marcos la vista dibuja un rectángulo con texto por página y
+# redibujar esos textos cuesta más que el mapa de píxeles de memorias mucho mayores, así que
+# las dos vistas se miden por separado y sus tiempos no se comparan entre sí.
+PRUEBAS = {
+    "asignacion": (prueba_asignacion, (2 ** 10, 2 ** 14, 2 ** 18)),
+    "asignacion_compacta": (prueba_asignacion_compacta, (2 ** 10, 2 ** 14, 2 ** 18)),
+    "vencimientos": (prueba_vencimientos, (1000, 10000, 100000)),
+    "panel_completo": (prueba_panel_completo, (100, 1000, 10000)),
+    "panel_tick": (prueba_panel_tick, (100, 1000, 10000)),
+    "render_etiquetas_completo": (prueba_render_completo, (16, 64)),
+    "render_etiquetas_cambios": (prueba_render_cambios, (16, 64)),
+    "render_completo": (prueba_render_completo, (2 ** 12, 2 ** 18)),
+    "render_cambios": (prueba_render_cambios, (2 ** 12, 2 ** 18)),
+}
+
+
+def medir(funcion, tamano, repeticiones):
+    # El mejor de varios intentos: es el menos afectado por el resto del sistema
+    return min(funcion(tamano) for _ in range(repeticiones))
+
+
+def ejecutar_pruebas(nombres=None, repeticiones=3):
+    # Devuelve ({"nombre[tamaño]": segundos}, {nombre: motivo de omisión})
+    resultados = {}
+    omitidas = {}
+    for nombre, (funcion, tamanos) in PRUEBAS.items():
+        if nombres and nombre not in nombres:
+            continue
+        try:
+            funcion(tamanos[0])  # Calentamiento: importaciones, cachés de fuentes, primera petición
+            for tamano in tamanos:
+                resultados[f"{nombre}[{tamano}]"] = medir(funcion, tamano, repeticiones)
+        except PruebaOmitida as motivo:
+            omitidas[nombre] = str(motivo)
+    return resultados, omitidas
+
+
+def commit_actual():
+    # Commit del árbol medido; "-dirty" si tiene cambios sin confirmar
+    try:
+        salida = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "desconocido"
+
+
+def cargar_historial(ruta):
+    try:
+        with open(ruta, encoding="utf-8") as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return []
+
+
+def guardar_historial(historial, ruta):
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(historial, archivo, indent=1)
+    os.replace(temporal, ruta)
+
+
+def buscar_referencia(historial, commit, referencia=None):
+    # Commit con el que comparar (el pedido o el último distinto del actual) y sus resultados;
+    # si se midió varias veces, por ejemplo con --solo, cada prueba toma su medida más reciente
+    for ejecucion in reversed(historial):
+        if referencia is not None and ejecucion["commit"].startswith(referencia) or \
+                referencia is None and ejecucion["commit"] != commit:
+            elegido = ejecucion["commit"]
+            break
+    else:
+        if referencia is not None:
+            raise ValueError(f"No hay resultados guardados del commit {referencia}.")
+        return None, {}
+    resultados = {}
+    for ejecucion in historial:
+        if ejecucion["commit"] == elegido:
+            resultados.update(ejecucion["resultados"])
+    return elegido, resultados
+
+
+def comparar(resultados, anteriores, umbral=0.2):
+    # (clave, anterior, actual, cociente) de cada prueba más lenta que "umbral" (0.2 = 20 %)
+    regresiones = []
+    for clave, actual in resultados.items():
+        anterior = anteriores.get(clave)
+        if anterior and actual > anterior * (1 + umbral):
+            regresiones.append((clave, anterior, actual, actual / anterior))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pruebas de rendimiento de la memoria, el motor, el panel y el dibujo")
+    parser.add_argument("--solo", nargs="+", choices=list(PRUEBAS), help="Ejecutar solo estas pruebas")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Intentos por medida (se guarda el mejor)")
+    parser.add_argument("--archivo", default="benchmarks.json",
+                        help="Historial de resultados por commit (ignorado por git)")
+    parser.add_argument("--comparar", help="Commit de referencia (por defecto, la última ejecución de otro commit)")
+    parser.add_argument("--umbral", type=float, default=0.2, help="Empeoramiento relativo que cuenta como regresión")
+    parser.add_argument("--no-guardar", action="store_true", help="No añadir esta ejecución al historial")
+    args = parser.parse_args(argv)
+
+    historial = cargar_historial(args.archivo)
+    commit = commit_actual()
+    try:
+        referencia, anteriores = buscar_referencia(historial, commit, args.comparar)
+    except ValueError as error:
+        parser.error(str(error))
+
+    resultados, omitidas = ejecutar_pruebas(args.solo, args.repeticiones)
+    print(f"{'prueba':>32} {'segundos':>12} {'anterior':>12} {'cambio':>8}")
+    for clave, segundos in resultados.items():
+        anterior = anteriores.get(clave)
+        cambio = f"{segundos / anterior - 1:+.1%}" if anterior else ""
+        anterior = f"{anterior:.6f}" if anterior else ""
+        print(f"{clave:>32} {segundos:>12.6f} {anterior:>12} {cambio:>8}")
+    for nombre, motivo in omitidas.items():
+        print(f"{nombre:>32} omitida ({motivo})")
+
+    if not args.no_guardar:
+        historial.append({
+            "commit": commit,
+            "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "maquina": platform.node(),
+            "resultados": resultados,
+        })
+        guardar_historial(historial, args.archivo)
+
+    regresiones = comparar(resultados, anteriores, args.umbral)
+    if referencia:
+        print(f"\nComparado con {referencia}: {len(regresiones)} regresiones")
+    for clave, anterior, actual, cociente in regresiones:
+        print(f"  REGRESIÓN {clave}: {anterior:.6f} s -> {actual:.6f} s (x{cociente:.2f})")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
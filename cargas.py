@@ -0,0 +1,225 @@
+import argparse
+import csv
+import gzip
+import io
+import math
+import random
+import sys
+
+
+# Distribuciones de tamaños y duraciones. Todas devuelven enteros con muestra(aleatorio),
+# usando el generador que se les pasa para que la carga sea reproducible con su semilla.
+
+
+class Constante:
+    def __init__(self, valor):
+        self.valor = valor
+
+    def muestra(self, aleatorio):
+        return self.valor
+
+
+class Uniforme:
+    def __init__(self, minimo, maximo):
+        if minimo > maximo:
+            raise ValueError("El mínimo de la distribución uniforme no puede superar al máximo.")
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def muestra(self, aleatorio):
+        return aleatorio.randint(self.minimo, self.maximo)
+
+
+class Exponencial:
+    def __init__(self, media, minimo=1, maximo=None):
+        if media <= 0:
+            raise ValueError("La media de la distribución exponencial debe ser positiva.")
+        self.media = media
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def muestra(self, aleatorio):
+        valor = max(self.minimo, round(aleatorio.expovariate(1 / self.media)))
+        return valor if self.maximo is None else min(valor, self.maximo)
+
+
+class Pareto:
+    # Cola pesada: la mayoría de los valores son pequeños y unos pocos muy grandes.
+    # Con alfa <= 2 la varianza es infinita; conviene acotar con "maximo".
+    def __init__(self, alfa, minimo=1, maximo=None):
+        if alfa <= 0 or minimo <= 0:
+            raise ValueError("Los parámetros de la distribución de Pareto deben ser positivos.")
+        self.alfa = alfa
+        self.minimo = minimo
+        self.maximo = maximo
+
+    def muestra(self, aleatorio):
+        valor = int(self.minimo * aleatorio.paretovariate(self.alfa))
+        return valor if self.maximo is None else min(valor, self.maximo)
+
+
+DISTRIBUCIONES = {
+    "constante": Constante,
+    "uniforme": Uniforme,
+    "exponencial": Exponencial,
+    "pareto": Pareto,
+}
+
+
+def distribucion(especificacion):
+    # "uniforme:1:20", "exponencial:10", "pareto:1.5:4:256", "constante:8"
+    nombre, *parametros = especificacion.split(":")
+    if nombre not in DISTRIBUCIONES:
+        raise ValueError(f"Distribución desconocida: {nombre}")
+    return DISTRIBUCIONES[nombre](*(float(parametro) if "." in parametro else int(parametro)
+                                    for parametro in parametros))
+
+
+# Procesos de llegada: intervalo(aleatorio, tiempo) devuelve el tiempo hasta la próxima llegada
+
+
+class LlegadasPoisson:
+    def __init__(self, tasa):
+        if tasa <= 0:
+            raise ValueError("La tasa de llegadas debe ser positiva.")
+        self.tasa = tasa  # Llegadas por unidad de tiempo
+
+    def intervalo(self, aleatorio, tiempo):
+        return aleatorio.expovariate(self.tasa)
+
+
+class LlegadasFases:
+    # Llegadas de Poisson cuya tasa cambia por fases que se repiten: [(tasa, duración), ...].
+    # Sirve para cargas a ráfagas, p. ej. [(5.0, 20), (0.1, 200)].
+    def __init__(self, fases):
+        if not fases or any(tasa <= 0 or duracion <= 0 for tasa, duracion in fases):
+            raise ValueError("Cada fase necesita una tasa y una duración positivas.")
+        self.fases = fases
+        self.ciclo = sum(duracion for _, duracion in fases)
+
+    def intervalo(self, aleatorio, tiempo):
+        # Si la llegada cae fuera de la fase actual, se vuelve a sortear desde el inicio de
+        # la siguiente (sin memoria, así que el resultado sigue siendo un proceso de Poisson)
+        inicio = tiempo
+        while True:
+            posicion = tiempo % self.ciclo
+            for tasa, duracion in self.fases:
+                if posicion < duracion:
+                    break
+                posicion -= duracion
+            restante = max(duracion - posicion, 1e-9)  # Sin quedarse atascado por redondeos
+            intervalo = aleatorio.expovariate(tasa)
+            if intervalo < restante:
+                return tiempo + intervalo - inicio
+            tiempo += restante
+
+
+class LlegadasIntervalo:
+    # Intervalos entre llegadas tomados de una distribución (p. ej. uniforme:0:2)
+    def __init__(self, distribucion):
+        self.distribucion = distribucion
+
+    def intervalo(self, aleatorio, tiempo):
+        return self.distribucion.muestra(aleatorio)
+
+
+def llegadas(especificacion):
+    # "poisson:0.5", "fases:5x20,0.1x200" o cualquier distribución de intervalos
+    nombre, _, parametros = especificacion.partition(":")
+    if nombre == "poisson":
+        return LlegadasPoisson(float(parametros))
+    if nombre == "fases":
+        return LlegadasFases([(float(tasa), float(duracion))
+                              for tasa, duracion in (fase.split("x") for fase in parametros.split(","))])
+    return LlegadasIntervalo(distribucion(especificacion))
+
+
+class Carga:
+    # Generador de procesos sintéticos. Produce la carga bajo demanda, de modo que se
+    # pueden simular trazas más grandes que la memoria sin llegar a guardarlas.
+    def __init__(self, tamanos, duraciones, llegadas=None, prioridades=None, semilla=None):
+        self.tamanos = tamanos
+        self.duraciones = duraciones
+        self.llegadas = LlegadasIntervalo(Constante(1)) if llegadas is None else llegadas
+        self.prioridades = prioridades
+        self.aleatorio = random.Random(semilla)
+        self.tiempo = 0.0
+        self.siguiente_id = 1
+
+    def muestrear(self):
+        # (tamaño, duración, prioridad) de un proceso, sin instante de llegada
+        aleatorio = self.aleatorio
+        prioridad = self.prioridades.muestra(aleatorio) if self.prioridades is not None else 0
+        return self.tamanos.muestra(aleatorio), self.duraciones.muestra(aleatorio), prioridad
+
+    def procesos(self, cantidad=None):
+        # (llegada, id, tamaño, duración, prioridad) en orden de llegada; sin fin si cantidad es None
+        generados = 0
+        while cantidad is None or generados < cantidad:
+            self.tiempo += self.llegadas.intervalo(self.aleatorio, self.tiempo)
+            tamano, duracion, prioridad = self.muestrear()
+            yield math.floor(self.tiempo), self.siguiente_id, tamano, duracion, prioridad
+            self.siguiente_id += 1
+            generados += 1
+
+    def eventos(self, cantidad=None):
+        # Eventos para MotorSimulacion: la duración es el tiempo de vida del proceso
+        tiempo = 0
+        for llegada, proceso_id, tamano, duracion, _ in self.procesos(cantidad):
+            if llegada > tiempo:
+                yield ("avanzar", llegada - tiempo)
+                tiempo = llegada
+            yield ("crear", proceso_id, tamano, duracion)
+
+    def llegadas_planificador(self, cantidad=None):
+        # (llegada, proceso) para Planificador.ejecutar: la duración es la ráfaga de CPU
+        for llegada, proceso_id, tamano, duracion, prioridad in self.procesos(cantidad):
+            yield llegada, {"PID": proceso_id, "Burst Time": duracion, "Memory": tamano, "Priority": prioridad}
+
+
+def abrir_traza(ruta, modo="r"):
+    # "-" es la entrada o salida estándar; los archivos .gz se comprimen al vuelo
+    if ruta == "-":
+        if "w" in modo:
+            return io.TextIOWrapper(sys.stdout.buffer, newline="", encoding="utf-8", write_through=True)
+        return sys.stdin
+    if ruta.endswith(".gz"):
+        return gzip.open(ruta, modo + "t", newline="", encoding="utf-8")
+    return open(ruta, modo, newline="", encoding="utf-8")
+
+
+def escribir_traza(eventos, archivo):
+    # Escribe los eventos en el formato CSV que lee motor_simulacion.leer_traza_csv
+    escritor = csv.writer(archivo)
+    escritos = 0
+    for evento in eventos:
+        if evento[0] == "crear" and evento[3] is None:
+            escritor.writerow(evento[:3])
+        else:
+            escritor.writerow(evento)
+        escritos += 1
+    return escritos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera una traza sintética para motor_simulacion.py")
+    parser.add_argument("salida", help="Archivo de la traza (.csv o .csv.gz); '-' para la salida estándar")
+    parser.add_argument("--procesos", type=int, default=10000, help="Número de procesos")
+    parser.add_argument("--tamanos", default="uniforme:1:64", help="Distribución de tamaños, p. ej. pareto:1.5:4:1024")
+    parser.add_argument("--vidas", default="exponencial:20", help="Distribución de tiempos de vida")
+    parser.add_argument("--llegadas", default="poisson:1.0", help="Llegadas: poisson:tasa, fases:5x20,0.1x200 o una distribución de intervalos")
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    carga = Carga(distribucion(args.tamanos), distribucion(args.vidas), llegadas(args.llegadas), semilla=args.semilla)
+    archivo = abrir_traza(args.salida, "w")
+    try:
+        escribir_traza(carga.eventos(args.procesos), archivo)
+    finally:
+        archivo.flush()
+        if args.salida != "-":
+            archivo.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from array import array
+from collections import deque
+from itertools import islice
+import json
+
+
+def formatear_entrada(entrada):
+    # Línea de texto de una entrada (tiempo, proceso, asignadas, liberadas), o None si no movió páginas
+    tiempo, proceso_id, paginas_asignadas, paginas_liberadas = entrada
+    if paginas_asignadas:
+        return f"Tiempo {tiempo}: Proceso {proceso_id} ASIGNADO - Páginas: {list(paginas_asignadas)}\n"
+    if paginas_liberadas:
+        return f"Tiempo {tiempo}: Proceso {proceso_id} LIBERADO - Páginas: {list(paginas_liberadas)}\n"
+    return None
+
+
+class HistorialAsignaciones:
+    # Historial de asignaciones de solo anexado. Conserva en memoria las últimas
+    # max_entradas; las más antiguas se descartan o, si hay archivo de volcado,
+    # se escriben en él como JSONL y se pueden volver a leer con leer().
+    # Cada entrada tiene un índice global que no cambia mientras no se limpie el historial.
+    def __init__(self, max_entradas=None, archivo_volcado=None):
+        self.entradas = deque(maxlen=max_entradas)
+        if isinstance(archivo_volcado, str):
+            archivo_volcado = open(archivo_volcado, "w+b")
+        self.volcado = archivo_volcado
+        self.desplazamientos = array('q')  # Posición en el archivo de cada entrada volcada
+        self.total = 0
+        self.generacion = 0  # Aumenta cada vez que se limpia el historial
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def __iter__(self):
+        return iter(self.entradas)
+
+    def append(self, entrada):
+        if len(self.entradas) == self.entradas.maxlen:
+            self.volcar(self.entradas[0])
+        self.entradas.append(entrada)
+        self.total += 1
+
+    def volcar(self, entrada):
+        if self.volcado is None:
+            return
+        tiempo, proceso_id, paginas_asignadas, paginas_liberadas = entrada
+        self.volcado.seek(0, 2)
+        self.desplazamientos.append(self.volcado.tell())
+        linea = json.dumps([tiempo, proceso_id, list(paginas_asignadas), list(paginas_liberadas)])
+        self.volcado.write(linea.encode("utf-8") + b"\n")
+
+    def primer_indice(self):
+        # Índice global de la entrada más antigua que sigue en memoria
+        return self.total - len(self.entradas)
+
+    def desde(self, indice):
+        # Entradas en memoria con índice global >= indice
+        return islice(self.entradas, max(indice - self.primer_indice(), 0), None)
+
+    def leer(self, inicio, fin):
+        # Entradas con índice global en [inicio, fin), recuperando del archivo las que ya
+        # no están en memoria. Si las primeras se descartaron sin volcado, se omiten.
+        primer_volcado = self.primer_indice() - len(self.desplazamientos)
+        inicio = max(inicio, primer_volcado)
+        fin = min(fin, self.total)
+        resultado = []
+        if inicio >= fin:
+            return resultado
+        en_memoria = self.primer_indice()
+        if inicio < min(fin, en_memoria):
+            self.volcado.seek(self.desplazamientos[inicio - primer_volcado])
+            for _ in range(min(fin, en_memoria) - inicio):
+                resultado.append(tuple(json.loads(self.volcado.readline())))
+        if fin > en_memoria:
+            resultado.extend(islice(self.desde(inicio), fin - max(inicio, en_memoria)))
+        return resultado
+
+    def limpiar(self):
+        self.entradas.clear()
+        self.desplazamientos = array('q')
+        if self.volcado is not None:
+            self.volcado.seek(0)
+            self.volcado.truncate()
+        self.total = 0
+        self.generacion += 1
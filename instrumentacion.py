@@ -0,0 +1,217 @@
+from bisect import bisect_left
+from collections import Counter
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+
+# Contadores e histogramas de latencia de los puntos calientes de los simuladores.
+# Desactivada (por defecto) cada función medida solo paga una comprobación de "activa";
+# se activa con activar() o con la variable de entorno INSTRUMENTACION=1.
+# Las métricas son de cada proceso: con varios procesos servidores cada uno tiene las suyas.
+
+activa = os.environ.get("INSTRUMENTACION", "") not in ("", "0")
+
+# Límites superiores (segundos) de los intervalos de los histogramas de latencia
+LIMITES_LATENCIA = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)
+
+lock = threading.Lock()
+contadores = {}  # nombre -> valor
+histogramas = {}  # nombre -> Histograma
+descripciones = {}  # nombre -> texto de ayuda
+
+
+class Histograma:
+    def __init__(self, limites=LIMITES_LATENCIA):
+        self.limites = limites
+        self.cubetas = [0] * (len(limites) + 1)  # La última es para lo que supera todos los límites
+        self.cantidad = 0
+        self.suma = 0.0
+
+    def observar(self, valor):
+        self.cubetas[bisect_left(self.limites, valor)] += 1
+        self.cantidad += 1
+        self.suma += valor
+
+    def percentil(self, fraccion):
+        # Límite superior de la cubeta que contiene el percentil (aproximado por arriba)
+        objetivo = fraccion * self.cantidad
+        acumulado = 0
+        for limite, cubeta in zip(self.limites, self.cubetas):
+            acumulado += cubeta
+            if acumulado >= objetivo:
+                return limite
+        return float("inf")
+
+
+def activar():
+    global activa
+    activa = True
+
+
+def desactivar():
+    global activa
+    activa = False
+
+
+def describir(nombre, descripcion):
+    descripciones[nombre] = descripcion
+
+
+def contar(nombre, cantidad=1):
+    if not activa:
+        return
+    with lock:
+        contadores[nombre] = contadores.get(nombre, 0) + cantidad
+
+
+def observar(nombre, segundos):
+    if not activa:
+        return
+    with lock:
+        histograma = histogramas.get(nombre)
+        if histograma is None:
+            histograma = histogramas[nombre] = Histograma()
+        histograma.observar(segundos)
+
+
+def medir(nombre, descripcion=None):
+    # Decorador: cuenta las llamadas y registra su duración en el histograma "nombre"
+    if descripcion:
+        describir(nombre, descripcion)
+
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def medida(*args, **kwargs):
+            if not activa:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                observar(nombre, time.perf_counter() - inicio)
+        return medida
+    return decorador
+
+
+def reiniciar():
+    with lock:
+        contadores.clear()
+        histogramas.clear()
+
+
+def instantanea():
+    # Estado actual de las métricas, listo para volcar en JSON
+    with lock:
+        return {
+            "instante": time.time(),
+            "contadores": dict(contadores),
+            "latencias": {nombre: {
+                "llamadas": histograma.cantidad,
+                "total_s": histograma.suma,
+                "media_s": histograma.suma / histograma.cantidad if histograma.cantidad else 0.0,
+                "p50_s": histograma.percentil(0.5),
+                "p99_s": histograma.percentil(0.99),
+            } for nombre, histograma in histogramas.items()},
+        }
+
+
+def texto_prometheus(prefijo="simulador_"):
+    # Formato de texto de exposición de Prometheus (version 0.0.4)
+    lineas = []
+    with lock:
+        for nombre, valor in sorted(contadores.items()):
+            metrica = f"{prefijo}{nombre}_total"
+            if nombre in descripciones:
+                lineas.append(f"# HELP {metrica} {descripciones[nombre]}")
+            lineas.append(f"# TYPE {metrica} counter")
+            lineas.append(f"{metrica} {valor}")
+        for nombre, histograma in sorted(histogramas.items()):
+            metrica = f"{prefijo}{nombre}_segundos"
+            if nombre in descripciones:
+                lineas.append(f"# HELP {metrica} {descripciones[nombre]}")
+            lineas.append(f"# TYPE {metrica} histogram")
+            acumulado = 0
+            for limite, cubeta in zip(histograma.limites, histograma.cubetas):
+                acumulado += cubeta
+                lineas.append(f'{metrica}_bucket{{le="{limite:g}"}} {acumulado}')
+            lineas.append(f'{metrica}_bucket{{le="+Inf"}} {histograma.cantidad}')
+            lineas.append(f"{metrica}_sum {histograma.suma}")
+            lineas.append(f"{metrica}_count {histograma.cantidad}")
+    return "\n".join(lineas) + "\n"
+
+
+def volcar_json(ruta):
+    # Se escribe en un temporal y se renombra: quien lea el archivo nunca lo ve a medias
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(instantanea(), archivo, indent=1)
+    os.replace(temporal, ruta)
+
+
+class VolcadoPeriodico:
+    # Hilo que vuelca instantanea() en un archivo JSON cada "intervalo" segundos y al detenerse
+    def __init__(self, ruta, intervalo=5.0):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.detener_evento = threading.Event()
+        self.hilo = threading.Thread(target=self.bucle, daemon=True)
+
+    def iniciar(self):
+        self.hilo.start()
+
+    def detener(self):
+        self.detener_evento.set()
+        self.hilo.join()
+        volcar_json(self.ruta)
+
+    def bucle(self):
+        while not self.detener_evento.wait(self.intervalo):
+            volcar_json(self.ruta)
+
+
+class Perfilador:
+    # Perfilador por muestreo: cada "intervalo" segundos anota la pila de cada hilo.
+    # No toca las funciones medidas, así que se puede encender y apagar en marcha.
+    def __init__(self, intervalo=0.005):
+        self.intervalo = intervalo
+        self.muestras = Counter()  # pila "archivo:función;..." -> veces vista
+        self.detener_evento = threading.Event()
+        self.hilo = None
+
+    def iniciar(self):
+        if self.hilo is not None and self.hilo.is_alive():
+            return
+        self.detener_evento.clear()
+        self.hilo = threading.Thread(target=self.bucle, daemon=True)
+        self.hilo.start()
+
+    def detener(self):
+        self.detener_evento.set()
+        if self.hilo is not None:
+            self.hilo.join()
+
+    def bucle(self):
+        propio = threading.get_ident()
+        while not self.detener_evento.wait(self.intervalo):
+            for id_hilo, marco in sys._current_frames().items():
+                if id_hilo == propio:
+                    continue
+                pila = []
+                while marco is not None:
+                    codigo = marco.f_code
+                    pila.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}")
+                    marco = marco.f_back
+                self.muestras[";".join(reversed(pila))] += 1
+
+    def plegado(self):
+        # Pilas plegadas ("pila veces" por línea), el formato de entrada de flamegraph.pl y speedscope
+        return "".join(f"{pila} {veces}\n" for pila, veces in self.muestras.most_common())
+
+
+perfilador = Perfilador()
+if os.environ.get("INSTRUMENTACION_PERFIL", "") not in ("", "0"):
+    perfilador.iniciar()
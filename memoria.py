@@ -0,0 +1,295 @@
+from array import array
+import random
+import time
+
+from historial import HistorialAsignaciones
+import instrumentacion
+from politicas import POLITICAS, agrupar_tramos
+
+
+class Proceso:
+    def __init__(self, id_proceso, tamano, tiempo_llegada=0, tiempo_vida=None):
+        self.id_proceso = id_proceso
+        self.tamano = tamano
+        self.tiempo_llegada = tiempo_llegada
+        self.tiempo_vida = tiempo_vida
+        self.paginas = []
+
+    def __str__(self):
+        return f"Proceso {self.id_proceso} (Tamaño: {self.tamano})"
+
+
+# Valor que marca un marco libre en la representación compacta
+MARCO_LIBRE = -1
+
+
+class MarcosCompactos:
+    # Propietario de cada marco guardado en un array de enteros de 32 bits.
+    # Se comporta como la lista de memoria_fisica: los marcos libres se leen como None.
+    def __init__(self, num_paginas):
+        self.marcos = array('i', [MARCO_LIBRE]) * num_paginas
+
+    def __len__(self):
+        return len(self.marcos)
+
+    def __getitem__(self, indice):
+        proceso_id = self.marcos[indice]
+        return None if proceso_id == MARCO_LIBRE else proceso_id
+
+    def __setitem__(self, indice, proceso_id):
+        self.marcos[indice] = MARCO_LIBRE if proceso_id is None else proceso_id
+
+    def __iter__(self):
+        for proceso_id in self.marcos:
+            yield None if proceso_id == MARCO_LIBRE else proceso_id
+
+
+class RastreadorCambios:
+    # Marcos modificados desde la última vez que se consumieron los cambios.
+    # "completo" indica que la memoria se reinició y hay que leerla entera.
+    def __init__(self):
+        self.marcos = set()
+        self.completo = True
+
+    def consumir(self):
+        self.marcos = set()
+        self.completo = False
+
+
+class MetricasAsignacion:
+    # Métricas acumuladas de las asignaciones de una Memoria
+    def __init__(self):
+        self.asignaciones = 0
+        self.rechazos = 0
+        self.fragmentacion_interna = 0  # Bytes reservados y sin usar de los procesos en memoria
+        self.fragmentacion_interna_acumulada = 0
+        self.tramos_acumulados = 0  # Tramos contiguos por asignación, sumados
+        self.latencia_acumulada = 0.0
+        self.histograma_latencias = {}  # Cota superior en microsegundos -> asignaciones
+        self.por_proceso = {}  # ID -> bytes de fragmentación interna
+        self.ultima = None
+
+    def registrar_latencia(self, latencia):
+        self.latencia_acumulada += latencia
+        cota = 1 << int(latencia * 1e6).bit_length()
+        self.histograma_latencias[cota] = self.histograma_latencias.get(cota, 0) + 1
+
+    def registrar_asignacion(self, proceso_id, fragmentacion, tramos, latencia):
+        self.asignaciones += 1
+        self.fragmentacion_interna += fragmentacion
+        self.fragmentacion_interna_acumulada += fragmentacion
+        self.tramos_acumulados += tramos
+        self.por_proceso[proceso_id] = fragmentacion
+        self.registrar_latencia(latencia)
+        self.ultima = {"proceso": proceso_id, "fragmentacion_interna": fragmentacion,
+                       "tramos": tramos, "latencia": latencia}
+
+    def registrar_rechazo(self, latencia):
+        self.rechazos += 1
+        self.registrar_latencia(latencia)
+
+    def registrar_liberacion(self, proceso_id):
+        self.fragmentacion_interna -= self.por_proceso.pop(proceso_id, 0)
+
+    def resumen(self):
+        intentos = self.asignaciones + self.rechazos
+        return {
+            "asignaciones": self.asignaciones,
+            "rechazos": self.rechazos,
+            "tasa_admision": self.asignaciones / intentos if intentos else 0.0,
+            "fragmentacion_interna_bytes": self.fragmentacion_interna,
+            "fragmentacion_interna_media": (self.fragmentacion_interna_acumulada / self.asignaciones
+                                            if self.asignaciones else 0.0),
+            "tramos_por_asignacion": self.tramos_acumulados / self.asignaciones if self.asignaciones else 0.0,
+            "latencia_media_us": self.latencia_acumulada / intentos * 1e6 if intentos else 0.0,
+        }
+
+
+class Memoria:
+    def __init__(self, tamano_total, tamano_pagina, compacta=False, max_historial=None, archivo_historial=None,
+                 politica="primer_ajuste"):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de ubicación desconocida: {politica}")
+        self.tamano_total = tamano_total
+        self.tamano_pagina = tamano_pagina
+        self.compacta = compacta
+        self.politica = politica
+        self.num_paginas = tamano_total // tamano_pagina
+        self.crear_memoria_fisica()
+        self.tabla_paginas = {}
+        self.historial_asignaciones = HistorialAsignaciones(max_historial, archivo_historial)
+        self.tiempo_actual = 0
+        self.metricas = MetricasAsignacion()
+        self.rastreadores = []
+
+    def nuevo_rastreador(self):
+        rastreador = RastreadorCambios()
+        self.rastreadores.append(rastreador)
+        return rastreador
+
+    def quitar_rastreador(self, rastreador):
+        # Quien deja de leer los cambios debe quitar su rastreador: si no, se sigue actualizando
+        if rastreador in self.rastreadores:
+            self.rastreadores.remove(rastreador)
+
+    def crear_memoria_fisica(self):
+        if self.compacta:
+            self.memoria_fisica = MarcosCompactos(self.num_paginas)
+        else:
+            self.memoria_fisica = [None] * self.num_paginas
+        # La política de ubicación lleva la cuenta de las páginas libres
+        self.paginas_libres = POLITICAS[self.politica](self.num_paginas, self.compacta)
+
+    def comprobar_id(self, proceso_id):
+        if self.compacta and not (isinstance(proceso_id, int) and 0 <= proceso_id < 2 ** 31):
+            raise ValueError("En la memoria compacta el ID del proceso debe ser un entero entre 0 y 2^31 - 1.")
+
+    @instrumentacion.medir("memoria_asignar", "Duración de Memoria.asignar_memoria")
+    def asignar_memoria(self, proceso):
+        num_paginas_necesarias = (proceso.tamano + self.tamano_pagina - 1) // self.tamano_pagina
+
+        self.comprobar_id(proceso.id_proceso)
+
+        inicio = time.perf_counter()
+        paginas_asignadas = self.paginas_libres.tomar(num_paginas_necesarias)
+        if paginas_asignadas is None:
+            self.metricas.registrar_rechazo(time.perf_counter() - inicio)
+            instrumentacion.contar("memoria_rechazos")
+            return False, 0
+
+        if self.compacta:
+            paginas_asignadas = array('i', paginas_asignadas)
+        for pagina_libre in paginas_asignadas:
+            self.memoria_fisica[pagina_libre] = proceso.id_proceso
+        latencia = time.perf_counter() - inicio
+        # Algunas políticas reservan más páginas de las necesarias; esos bytes también son fragmentación interna
+        fragmentacion = len(paginas_asignadas) * self.tamano_pagina - proceso.tamano
+        self.metricas.registrar_asignacion(proceso.id_proceso, fragmentacion,
+                                           len(agrupar_tramos(paginas_asignadas)), latencia)
+
+        self.tabla_paginas[proceso.id_proceso] = paginas_asignadas
+        for rastreador in self.rastreadores:
+            rastreador.marcos.update(paginas_asignadas)
+        proceso.paginas = paginas_asignadas
+        self.historial_asignaciones.append((self.tiempo_actual, proceso.id_proceso, paginas_asignadas, []))
+        return True, len(paginas_asignadas)
+
+    @instrumentacion.medir("memoria_desasignar", "Duración de Memoria.desasignar_memoria")
+    def desasignar_memoria(self, proceso):
+        if proceso.id_proceso not in self.tabla_paginas:
+            return 0
+
+        paginas_liberadas = self.tabla_paginas.pop(proceso.id_proceso)
+        for num_pagina in paginas_liberadas:
+            self.memoria_fisica[num_pagina] = None
+        self.paginas_libres.devolver(paginas_liberadas)
+        self.metricas.registrar_liberacion(proceso.id_proceso)
+        for rastreador in self.rastreadores:
+            rastreador.marcos.update(paginas_liberadas)
+
+        self.historial_asignaciones.append((self.tiempo_actual, proceso.id_proceso, [], paginas_liberadas))
+        proceso.paginas = []
+        return len(paginas_liberadas)
+
+    def traducir(self, proceso_id, direccion_logica):
+        # Dirección física de una dirección lógica del proceso (sin TLB; ver tlb.py)
+        pagina, desplazamiento = divmod(direccion_logica, self.tamano_pagina)
+        tabla = self.tabla_paginas.get(proceso_id)
+        if tabla is None:
+            raise ValueError(f"El proceso {proceso_id} no tiene memoria asignada.")
+        if isinstance(tabla, dict):
+            raise ValueError(f"El proceso {proceso_id} usa paginación bajo demanda; sus páginas se traducen en MemoriaVirtual.")
+        if not 0 <= pagina < len(tabla):
+            raise ValueError(f"La dirección {direccion_logica} está fuera del espacio lógico del proceso {proceso_id}.")
+        return tabla[pagina] * self.tamano_pagina + desplazamiento
+
+    # Operaciones de un solo marco para la paginación bajo demanda (ver memoria_virtual.py).
+    # La tabla de páginas de esos procesos es un diccionario {marco: página lógica}.
+    def tomar_marco(self, proceso_id, pagina):
+        # Ocupa un marco libre con una página del proceso; None si no queda ninguno
+        self.comprobar_id(proceso_id)
+        marcos = self.paginas_libres.tomar(1)
+        if not marcos:
+            return None
+        marco = marcos[0]
+        self.memoria_fisica[marco] = proceso_id
+        self.tabla_paginas.setdefault(proceso_id, {})[marco] = pagina
+        for rastreador in self.rastreadores:
+            rastreador.marcos.add(marco)
+        return marco
+
+    def reemplazar_marco(self, marco, proceso_id, pagina):
+        # Entrega un marco ocupado a otra página, posiblemente de otro proceso
+        self.comprobar_id(proceso_id)
+        anterior = self.memoria_fisica[marco]
+        tabla_anterior = self.tabla_paginas[anterior]
+        del tabla_anterior[marco]
+        if not tabla_anterior:
+            del self.tabla_paginas[anterior]
+        self.memoria_fisica[marco] = proceso_id
+        self.tabla_paginas.setdefault(proceso_id, {})[marco] = pagina
+        for rastreador in self.rastreadores:
+            rastreador.marcos.add(marco)
+
+    def soltar_marco(self, marco):
+        proceso_id = self.memoria_fisica[marco]
+        tabla = self.tabla_paginas[proceso_id]
+        del tabla[marco]
+        if not tabla:
+            del self.tabla_paginas[proceso_id]
+        self.memoria_fisica[marco] = None
+        self.paginas_libres.devolver([marco])
+        for rastreador in self.rastreadores:
+            rastreador.marcos.add(marco)
+
+    def generar_color_proceso(self, proceso_id):
+        # Generador propio: el mismo color para cada ID sin tocar el estado global de random
+        aleatorio = random.Random(proceso_id)
+        r = aleatorio.randint(100, 255)
+        g = aleatorio.randint(100, 255)
+        b = aleatorio.randint(100, 255)
+        return f'#{r:02x}{g:02x}{b:02x}'
+
+    def obtener_info_paginas(self):
+        info = []
+        for i, proceso_id in enumerate(self.memoria_fisica):
+            if proceso_id is not None:
+                info.append(f"Página {i}: Proceso {proceso_id}")
+            else:
+                info.append(f"Página {i}: Libre")
+        return info
+
+    def histograma_huecos(self):
+        # Tramos libres contiguos agrupados por longitud: {1: n, 2: n (2-3), 4: n (4-7), ...}
+        longitudes = []
+        longitud = 0
+        for proceso_id in self.memoria_fisica:
+            if proceso_id is None:
+                longitud += 1
+            elif longitud:
+                longitudes.append(longitud)
+                longitud = 0
+        if longitud:
+            longitudes.append(longitud)
+
+        histograma = {}
+        for longitud in longitudes:
+            cota = 1 << (longitud.bit_length() - 1)
+            histograma[cota] = histograma.get(cota, 0) + 1
+        return dict(sorted(histograma.items()))
+
+    def reiniciar_memoria(self, nuevo_tamano_total, politica=None):
+        if politica is not None:
+            if politica not in POLITICAS:
+                raise ValueError(f"Política de ubicación desconocida: {politica}")
+            self.politica = politica
+        self.tamano_total = nuevo_tamano_total
+        self.num_paginas = self.tamano_total // self.tamano_pagina
+        self.crear_memoria_fisica()
+        self.tabla_paginas = {}
+        self.historial_asignaciones.limpiar()
+        self.tiempo_actual = 0
+        self.metricas = MetricasAsignacion()
+        for rastreador in self.rastreadores:
+            rastreador.marcos = set()
+            rastreador.completo = True
@@ -1,90 +1,31 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import to_rgba
 from matplotlib.figure import Figure
 import matplotlib.patches as patches
-import random
-
-
-class Proceso:
-    def __init__(self, id_proceso, tamano, tiempo_llegada=0, tiempo_vida=None):
-        self.id_proceso = id_proceso
-        self.tamano = tamano
-        self.tiempo_llegada = tiempo_llegada
-        self.tiempo_vida = tiempo_vida
-        self.paginas = []
-
-    def __str__(self):
-        return f"Proceso {self.id_proceso} (Tamaño: {self.tamano})"
-
-
-class Memoria:
-    def __init__(self, tamano_total, tamano_pagina):
-        self.tamano_total = tamano_total
-        self.tamano_pagina = tamano_pagina
-        self.num_paginas = tamano_total // tamano_pagina
-        self.memoria_fisica = [None] * self.num_paginas
-        self.tabla_paginas = {}
-        self.historial_asignaciones = []
-        self.tiempo_actual = 0
-
-    def asignar_memoria(self, proceso):
-        num_paginas_necesarias = (proceso.tamano + self.tamano_pagina - 1) // self.tamano_pagina
-        paginas_libres = [i for i, pagina in enumerate(self.memoria_fisica) if pagina is None]
-
-        if len(paginas_libres) < num_paginas_necesarias:
-            return False, 0
-
-        paginas_asignadas = []
-        for _ in range(num_paginas_necesarias):
-            pagina_libre = paginas_libres.pop(0)
-            self.memoria_fisica[pagina_libre] = proceso.id_proceso
-            paginas_asignadas.append(pagina_libre)
-
-        self.tabla_paginas[proceso.id_proceso] = paginas_asignadas
-        proceso.paginas = paginas_asignadas
-        self.historial_asignaciones.append((self.tiempo_actual, proceso.id_proceso, paginas_asignadas, []))
-        return True, num_paginas_necesarias
-
-    def desasignar_memoria(self, proceso):
-        if proceso.id_proceso not in self.tabla_paginas:
-            return 0
-
-        paginas_liberadas = []
-        for num_pagina in self.tabla_paginas[proceso.id_proceso]:
-            self.memoria_fisica[num_pagina] = None
-            paginas_liberadas.append(num_pagina)
-
-        del self.tabla_paginas[proceso.id_proceso]
-        self.historial_asignaciones.append((self.tiempo_actual, proceso.id_proceso, [], paginas_liberadas))
-        proceso.paginas = []
-        return len(paginas_liberadas)
-
-    def generar_color_proceso(self, proceso_id):
-        random.seed(proceso_id)
-        r = random.randint(100, 255)
-        g = random.randint(100, 255)
-        b = random.randint(100, 255)
-        return f'#{r:02x}{g:02x}{b:02x}'
-
-    def obtener_info_paginas(self):
-        info = []
-        for i, proceso_id in enumerate(self.memoria_fisica):
-            if proceso_id is not None:
-                info.append(f"Página {i}: Proceso {proceso_id}")
-            else:
-                info.append(f"Página {i}: Libre")
-        return info
-
-    def reiniciar_memoria(self, nuevo_tamano_total):
-        self.tamano_total = nuevo_tamano_total
-        self.num_paginas = self.tamano_total // self.tamano_pagina
-        self.memoria_fisica = [None] * self.num_paginas
-        self.tabla_paginas = {}
-        self.historial_asignaciones = []
-        self.tiempo_actual = 0
-
+import numpy as np
+from collections import deque
+import tempfile
+
+from historial import formatear_entrada
+import instrumentacion
+from memoria import Memoria, Proceso
+from motor_simulacion import MotorSimulacion
+from politicas import POLITICAS
+
+# Hasta este número de páginas se dibuja un rectángulo con etiqueta por página
+MAX_PAGINAS_ETIQUETADAS = 64
+# Por encima de este número de páginas cada píxel del mapa resume un bloque de páginas
+MAX_PIXELES_MAPA = 512 * 512
+COLOR_LIBRE = to_rgba('lightgray')
+# Entradas del historial que se conservan en memoria; las anteriores se vuelcan a un archivo temporal
+MAX_HISTORIAL_MEMORIA = 5000
+# Líneas que se mantienen en el cuadro de historial y entradas que carga el botón de anteriores
+MAX_LINEAS_HISTORIAL = 500
+PAGINA_HISTORIAL = 100
 
 
 class SimulacionApp:
@@ -100,12 +41,23 @@ class SimulacionApp:
         # Valores iniciales
         self.tamano_memoria = 64
         self.tamano_pagina = 4
-        self.memoria = Memoria(self.tamano_memoria, self.tamano_pagina)
-        self.procesos_creados = []
+        self.motor = MotorSimulacion(self.tamano_memoria, self.tamano_pagina,
+                                     max_historial=MAX_HISTORIAL_MEMORIA,
+                                     archivo_historial=tempfile.TemporaryFile())
+        self.memoria = self.motor.memoria
+        # Solo se redibujan los marcos que cambiaron desde el último dibujo
+        self.cambios = self.memoria.nuevo_rastreador()
+        self.colores_procesos = {}
+        # Índice global de la entrada del historial que ocupa cada línea del cuadro
+        self.indices_historial = deque()
+        self.historial_primero = 0  # Primera entrada (mostrada o no) cubierta por el cuadro
+        self.historial_mostrado = 0  # Siguiente entrada por mostrar
+        self.generacion_historial = self.memoria.historial_asignaciones.generacion
         self.id_proceso_var = tk.IntVar()
         self.tamano_proceso_var = tk.IntVar()
         self.tiempo_vida_proceso_var = tk.IntVar()
         self.tamano_memoria_var = tk.IntVar(value=self.tamano_memoria)
+        self.politica_var = tk.StringVar(value=self.memoria.politica)
 
         self.crear_interfaz()
         self.actualizar_visualizacion()
@@ -123,6 +75,10 @@ class SimulacionApp:
         ttk.Label(frame_controles, text="Tamaño Total de Memoria (bytes):").pack()
         tamano_memoria_entry = ttk.Entry(frame_controles, textvariable=self.tamano_memoria_var)
         tamano_memoria_entry.pack()
+        ttk.Label(frame_controles, text="Política de Ubicación:").pack()
+        politica_combo = ttk.Combobox(frame_controles, textvariable=self.politica_var,
+                                      values=list(POLITICAS), state="readonly")
+        politica_combo.pack()
         actualizar_memoria_btn = ttk.Button(frame_controles, text="Actualizar Memoria", command=self.actualizar_tamano_memoria)
         actualizar_memoria_btn.pack(pady=5)
 
@@ -158,6 +114,8 @@ class SimulacionApp:
         ttk.Label(frame_controles, text="Historial de Asignaciones", font=("Arial", 12, "bold")).pack(pady=5)
         self.historial_text = scrolledtext.ScrolledText(frame_controles, width=40, height=10)
         self.historial_text.pack()
+        anteriores_btn = ttk.Button(frame_controles, text="Cargar Anteriores", command=self.cargar_historial_anterior)
+        anteriores_btn.pack(pady=5)
 
         ttk.Label(frame_controles, text="Información de Memoria", font=("Arial", 12, "bold")).pack(pady=5)
         self.info_memoria_label = ttk.Label(frame_controles, text=self.obtener_info_memoria())
@@ -171,6 +129,9 @@ class SimulacionApp:
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame_visualizacion)
         self.canvas_widget = self.canvas.get_tk_widget()  # Obtener el widget
         self.canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True) # expand=True!
+        # Barra de zoom y desplazamiento para memorias grandes
+        self.toolbar = NavigationToolbar2Tk(self.canvas, frame_visualizacion)
+        self.toolbar.update()
 
 
     def actualizar_tamano_memoria(self):
@@ -183,11 +144,7 @@ class SimulacionApp:
                 messagebox.showerror("Error", f"El tamaño de memoria deber ser multiplo del tamaño de pagina ({self.tamano_pagina})")
                 return
 
-            for proc in self.procesos_creados:
-                self.memoria.desasignar_memoria(proc)
-            self.procesos_creados = []
-
-            self.memoria.reiniciar_memoria(nuevo_tamano)
+            self.motor.reiniciar(nuevo_tamano, self.politica_var.get())
             self.actualizar_historial()
             self.actualizar_visualizacion()
             messagebox.showinfo("Memoria Actualizada", f"Tamaño de memoria actualizado a {nuevo_tamano} bytes.")
@@ -202,14 +159,12 @@ class SimulacionApp:
             tiempo_vida = self.tiempo_vida_proceso_var.get()
             tiempo_vida = None if tiempo_vida == -1 else tiempo_vida
 
-            if any(p.id_proceso == id_proceso for p in self.procesos_creados):
+            if id_proceso in self.motor.procesos:
                 messagebox.showerror("Error", "Ya existe un proceso con ese ID.")
                 return
 
-            nuevo_proceso = Proceso(id_proceso, tamano, self.memoria.tiempo_actual, tiempo_vida)
-            asignado, num_paginas = self.memoria.asignar_memoria(nuevo_proceso)
+            asignado, num_paginas = self.motor.crear_proceso(id_proceso, tamano, tiempo_vida)
             if asignado:
-                self.procesos_creados.append(nuevo_proceso)
                 messagebox.showinfo("Proceso Creado",
                                     f"Proceso {id_proceso} creado y asignado. Páginas asignadas: {num_paginas}")
                 self.actualizar_historial()
@@ -223,16 +178,9 @@ class SimulacionApp:
     def eliminar_proceso(self):
         try:
             id_eliminar = self.id_eliminar_var.get()
-            proceso_a_eliminar = None
-
-            for proc in self.procesos_creados:
-                if proc.id_proceso == id_eliminar:
-                    proceso_a_eliminar = proc
-                    break
+            paginas_liberadas = self.motor.eliminar_proceso(id_eliminar)
 
-            if proceso_a_eliminar:
-                paginas_liberadas = self.memoria.desasignar_memoria(proceso_a_eliminar)
-                self.procesos_creados.remove(proceso_a_eliminar)
+            if paginas_liberadas is not None:
                 messagebox.showinfo("Proceso Eliminado",
                                     f"Proceso {id_eliminar} eliminado. Páginas liberadas: {paginas_liberadas}")
                 self.actualizar_historial()
@@ -245,67 +193,193 @@ class SimulacionApp:
     def avanzar_tiempo(self):
         try:
             pasos = self.pasos_tiempo_var.get()
-            for _ in range(pasos):
-                self.memoria.tiempo_actual += 1
-                procesos_a_eliminar = []
-                for proc in self.procesos_creados:
-                    if proc.tiempo_vida is not None and self.memoria.tiempo_actual >= proc.tiempo_llegada + proc.tiempo_vida:
-                        procesos_a_eliminar.append(proc)
-                for proc in procesos_a_eliminar:
-                    self.memoria.desasignar_memoria(proc)
-                    self.procesos_creados.remove(proc)
-                    self.actualizar_historial()
-                    print(f"Tiempo {self.memoria.tiempo_actual}: Proceso {proc.id_proceso} finalizado y liberado.")
+            finalizados = self.motor.avanzar_tiempo(pasos)
+            if finalizados:
+                self.actualizar_historial()
             self.actualizar_visualizacion()
 
         except ValueError:
             messagebox.showerror("Error", "Entrada no válida para los pasos de tiempo.")
 
     def actualizar_historial(self):
-        self.historial_text.delete("1.0", tk.END)
-        for tiempo, proceso_id, paginas_asignadas, paginas_liberadas in self.memoria.historial_asignaciones:
-            if paginas_asignadas:
-                self.historial_text.insert(tk.END,
-                                           f"Tiempo {tiempo}: Proceso {proceso_id} ASIGNADO - Páginas: {paginas_asignadas}\n")
-            elif paginas_liberadas:
-                self.historial_text.insert(tk.END,
-                                           f"Tiempo {tiempo}: Proceso {proceso_id} LIBERADO - Páginas: {paginas_liberadas}\n")
-
+        # Solo inserta las entradas nuevas desde la última actualización
+        historial = self.memoria.historial_asignaciones
+        if historial.generacion != self.generacion_historial:
+            self.historial_text.delete("1.0", tk.END)
+            self.indices_historial.clear()
+            self.historial_mostrado = 0
+            self.generacion_historial = historial.generacion
+
+        indice = max(self.historial_mostrado, historial.primer_indice())
+        if not self.indices_historial:
+            self.historial_primero = indice
+        for entrada in historial.desde(self.historial_mostrado):
+            linea = formatear_entrada(entrada)
+            if linea is not None:
+                self.historial_text.insert(tk.END, linea)
+                self.indices_historial.append(indice)
+            indice += 1
+        self.historial_mostrado = historial.total
+
+        sobrantes = len(self.indices_historial) - MAX_LINEAS_HISTORIAL
+        if sobrantes > 0:
+            self.historial_text.delete("1.0", f"{sobrantes + 1}.0")
+            for _ in range(sobrantes):
+                self.indices_historial.popleft()
+            self.historial_primero = self.indices_historial[0]
+        self.historial_text.see(tk.END)
+
+    def cargar_historial_anterior(self):
+        # Recupera (de memoria o del archivo de volcado) las entradas previas a las del cuadro
+        fin = self.historial_primero
+        entradas = self.memoria.historial_asignaciones.leer(fin - PAGINA_HISTORIAL, fin)
+        indice = fin - len(entradas)
+        self.historial_primero = indice
+
+        lineas = []
+        indices = []
+        for entrada in entradas:
+            linea = formatear_entrada(entrada)
+            if linea is not None:
+                lineas.append(linea)
+                indices.append(indice)
+            indice += 1
+        if lineas:
+            self.indices_historial.extendleft(reversed(indices))
+            self.historial_text.insert("1.0", "".join(lineas))
+            self.historial_text.see("1.0")
+
+    @instrumentacion.medir("vista_actualizar", "Duración de SimulacionApp.actualizar_visualizacion")
     def actualizar_visualizacion(self):
-        self.ax1.clear()  # Limpiar el subplot
+        self.actualizar_artistas()
+        self.canvas.draw_idle()  # Redibujar el canvas
+        self.info_memoria_label.config(text=self.obtener_info_memoria())  # Actualizar info
+        self.root.update_idletasks() # Actualiza la interfaz.
 
-        # --- Memoria Física (Ahora ocupa todo el espacio) ---
+    def actualizar_artistas(self):
+        # Lleva a los artistas de matplotlib los marcos que cambiaron, sin dibujar
+        if self.cambios.completo:
+            self.preparar_visualizacion()
+        elif self.cambios.marcos:
+            if self.memoria.num_paginas <= MAX_PAGINAS_ETIQUETADAS:
+                self.actualizar_paginas(self.cambios.marcos)
+            else:
+                self.actualizar_mapa(self.cambios.marcos)
+        self.cambios.consumir()
+
+    def color_proceso(self, proceso_id):
+        color = self.colores_procesos.get(proceso_id)
+        if color is None:
+            color = to_rgba(self.memoria.generar_color_proceso(proceso_id))
+            self.colores_procesos[proceso_id] = color
+        return color
+
+    def preparar_visualizacion(self):
+        # Crea los artistas una sola vez por tamaño de memoria; después solo se modifican
+        self.ax1.clear()  # Limpiar el subplot
         self.ax1.set_title("Memoria Física (Paginada)")
+        self.ax1.set_yticks([])
+        self.ax1.format_coord = self.describir_posicion
+
+        if self.memoria.num_paginas <= MAX_PAGINAS_ETIQUETADAS:
+            self.preparar_paginas()
+        else:
+            self.preparar_mapa()
+
+    def preparar_paginas(self):
+        num_paginas = self.memoria.num_paginas
         self.ax1.set_xlabel("Número de Página")
         self.ax1.set_ylabel("Estado")
-        self.ax1.set_yticks([])
-        self.ax1.set_xticks(range(self.memoria.num_paginas))
-        self.ax1.set_xlim(-0.5, self.memoria.num_paginas - 0.5)
+        self.ax1.set_xticks(range(num_paginas))
+        self.ax1.set_xlim(-0.5, num_paginas - 0.5)
         self.ax1.set_ylim(-0.5, 0.5)
         self.ax1.set_aspect('equal')
 
-        for i in range(self.memoria.num_paginas):
-            color = 'lightgray'
-            label = 'Libre'
-            if self.memoria.memoria_fisica[i] is not None:
-                proceso_id = self.memoria.memoria_fisica[i]
-                color = self.memoria.generar_color_proceso(proceso_id)
-                label = f'P{proceso_id}'
-
-            rect = patches.Rectangle((i - 0.4, -0.4), 0.8, 0.8, linewidth=1, edgecolor='black', facecolor=color)
-            self.ax1.add_patch(rect)
-            self.ax1.text(i, 0, label, ha='center', va='center', color='black')
-
-        self.canvas.draw()  # Redibujar el canvas
-        self.info_memoria_label.config(text=self.obtener_info_memoria())  # Actualizar info
-        self.root.update_idletasks() # Actualiza la interfaz.
+        rectangulos = [patches.Rectangle((i - 0.4, -0.4), 0.8, 0.8) for i in range(num_paginas)]
+        self.coleccion_paginas = PatchCollection(rectangulos, linewidth=1, edgecolor='black')
+        self.colores_paginas = np.empty((num_paginas, 4))
+        self.etiquetas_paginas = []
+        for i in range(num_paginas):
+            self.colores_paginas[i] = COLOR_LIBRE
+            self.etiquetas_paginas.append(self.ax1.text(i, 0, 'Libre', ha='center', va='center', color='black'))
+        self.coleccion_paginas.set_facecolor(self.colores_paginas)
+        self.ax1.add_collection(self.coleccion_paginas)
+        self.actualizar_paginas(range(num_paginas))
+
+    def actualizar_paginas(self, marcos):
+        for i in marcos:
+            proceso_id = self.memoria.memoria_fisica[i]
+            if proceso_id is None:
+                self.colores_paginas[i] = COLOR_LIBRE
+                self.etiquetas_paginas[i].set_text('Libre')
+            else:
+                self.colores_paginas[i] = self.color_proceso(proceso_id)
+                self.etiquetas_paginas[i].set_text(f'P{proceso_id}')
+        self.coleccion_paginas.set_facecolor(self.colores_paginas)
+
+    def preparar_mapa(self):
+        # Mapa de píxeles: una página por píxel o, si no caben, la ocupación de cada bloque
+        num_paginas = self.memoria.num_paginas
+        self.paginas_por_pixel = -(-num_paginas // MAX_PIXELES_MAPA)
+        num_pixeles = -(-num_paginas // self.paginas_por_pixel)
+        self.columnas_mapa = int(np.ceil(np.sqrt(num_pixeles)))
+        filas = -(-num_pixeles // self.columnas_mapa)
+
+        if self.paginas_por_pixel == 1:
+            self.ax1.set_xlabel("Página (fila × columnas + columna)")
+            self.pixeles_mapa = np.ones((filas, self.columnas_mapa, 4))
+            self.pixeles_mapa[divmod(np.arange(num_paginas), self.columnas_mapa)] = COLOR_LIBRE
+            self.imagen_mapa = self.ax1.imshow(self.pixeles_mapa, interpolation='nearest')
+        else:
+            self.ax1.set_xlabel(f"Ocupación por bloque de {self.paginas_por_pixel} páginas")
+            self.pixeles_mapa = np.full((filas, self.columnas_mapa), np.nan)
+            self.pixeles_mapa[divmod(np.arange(num_pixeles), self.columnas_mapa)] = 0.0
+            self.imagen_mapa = self.ax1.imshow(self.pixeles_mapa, interpolation='nearest',
+                                               cmap='YlOrRd', vmin=0.0, vmax=1.0)
+        self.actualizar_mapa(range(num_paginas))
+
+    def actualizar_mapa(self, marcos):
+        memoria_fisica = self.memoria.memoria_fisica
+        if self.paginas_por_pixel == 1:
+            for i in marcos:
+                proceso_id = memoria_fisica[i]
+                color = COLOR_LIBRE if proceso_id is None else self.color_proceso(proceso_id)
+                self.pixeles_mapa[divmod(i, self.columnas_mapa)] = color
+        else:
+            bloques = {i // self.paginas_por_pixel for i in marcos}
+            for bloque in bloques:
+                inicio = bloque * self.paginas_por_pixel
+                fin = min(inicio + self.paginas_por_pixel, self.memoria.num_paginas)
+                ocupadas = sum(1 for i in range(inicio, fin) if memoria_fisica[i] is not None)
+                self.pixeles_mapa[divmod(bloque, self.columnas_mapa)] = ocupadas / (fin - inicio)
+        self.imagen_mapa.set_data(self.pixeles_mapa)
+
+    def describir_posicion(self, x, y):
+        # Texto de la barra de herramientas al pasar el ratón sobre la memoria
+        if x < -0.5 or y < -0.5:
+            return ""
+        if self.memoria.num_paginas <= MAX_PAGINAS_ETIQUETADAS:
+            inicio, paginas_por_pixel = int(round(x)), 1
+        else:
+            pixel = int(round(y)) * self.columnas_mapa + int(round(x))
+            inicio, paginas_por_pixel = pixel * self.paginas_por_pixel, self.paginas_por_pixel
+        if inicio >= self.memoria.num_paginas:
+            return ""
+        if paginas_por_pixel == 1:
+            proceso_id = self.memoria.memoria_fisica[inicio]
+            estado = "Libre" if proceso_id is None else f"Proceso {proceso_id}"
+            return f"Página {inicio}: {estado}"
+        fin = min(inicio + paginas_por_pixel, self.memoria.num_paginas) - 1
+        return f"Páginas {inicio}-{fin}"
 
 
     def obtener_info_memoria(self):
       return (f"Tamaño total de la memoria: {self.memoria.tamano_total} bytes\n"
               f"Tamaño de página: {self.memoria.tamano_pagina} bytes\n"
               f"Número total de páginas: {self.memoria.num_paginas}\n"
-              f"Tiempo actual: {self.memoria.tiempo_actual}")
+              f"Tiempo actual: {self.memoria.tiempo_actual}\n"
+              f"Política: {self.memoria.politica}\n"
+              f"Fragmentación interna: {self.memoria.metricas.fragmentacion_interna} bytes")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,321 @@
+import argparse
+from array import array
+from collections import OrderedDict
+import csv
+import heapq
+import time
+
+from memoria import Memoria
+
+
+# Algoritmos de reemplazo. Cada uno sigue las páginas residentes (claves (id, página))
+# y elige la víctima cuando no quedan marcos libres:
+#   acceso(clave, posicion)   -> la página residente se volvió a referenciar
+#   insertar(clave, posicion) -> la página se acaba de cargar
+#   victima()                 -> clave a expulsar (deja de seguirla)
+#   quitar(clave)             -> la página sale de memoria por otro motivo
+# "posicion" es el índice de la referencia en la traza; solo lo usa el óptimo.
+
+
+class ReemplazoFIFO:
+    def __init__(self):
+        self.orden = OrderedDict()
+
+    def preparar(self, referencias):
+        pass
+
+    def acceso(self, clave, posicion):
+        pass
+
+    def insertar(self, clave, posicion):
+        self.orden[clave] = None
+
+    def victima(self):
+        return self.orden.popitem(last=False)[0]
+
+    def quitar(self, clave):
+        self.orden.pop(clave, None)
+
+
+class ReemplazoLRU(ReemplazoFIFO):
+    # El OrderedDict se mantiene ordenado del uso más antiguo al más reciente
+    def acceso(self, clave, posicion):
+        self.orden.move_to_end(clave)
+
+
+class ReemplazoReloj:
+    # Segunda oportunidad: la manecilla recorre los marcos y solo expulsa
+    # páginas cuyo bit de referencia ya está apagado
+    def __init__(self):
+        self.claves = []  # Posición en el reloj -> clave, o None si está libre
+        self.referencia = bytearray()
+        self.posiciones = {}  # Clave -> posición en el reloj
+        self.huecos = []
+        self.manecilla = 0
+
+    def preparar(self, referencias):
+        pass
+
+    def acceso(self, clave, posicion):
+        self.referencia[self.posiciones[clave]] = 1
+
+    def insertar(self, clave, posicion):
+        if self.huecos:
+            indice = self.huecos.pop()
+            self.claves[indice] = clave
+            self.referencia[indice] = 1
+        else:
+            indice = len(self.claves)
+            self.claves.append(clave)
+            self.referencia.append(1)
+        self.posiciones[clave] = indice
+
+    def victima(self):
+        while True:
+            indice = self.manecilla
+            self.manecilla = (indice + 1) % len(self.claves)
+            clave = self.claves[indice]
+            if clave is None:
+                continue
+            if self.referencia[indice]:
+                self.referencia[indice] = 0
+                continue
+            self.quitar(clave)
+            return clave
+
+    def quitar(self, clave):
+        indice = self.posiciones.pop(clave, None)
+        if indice is not None:
+            self.claves[indice] = None
+            self.huecos.append(indice)
+
+
+class ReemplazoOptimo:
+    # Expulsa la página cuyo próximo uso está más lejos. Necesita la traza completa:
+    # preparar() calcula para cada referencia la posición de su siguiente uso.
+    def __init__(self):
+        self.siguiente_uso = None
+        self.proximo = {}  # Clave residente -> posición de su próximo uso
+        self.monticulo = []  # (-próximo uso, clave); las entradas viejas se descartan al salir
+
+    def preparar(self, referencias):
+        nunca = len(referencias)
+        self.siguiente_uso = array('q', [nunca]) * nunca
+        ultimo = {}
+        for posicion in range(nunca - 1, -1, -1):
+            clave = (referencias[posicion][0], referencias[posicion][1])
+            self.siguiente_uso[posicion] = ultimo.get(clave, nunca)
+            ultimo[clave] = posicion
+
+    def acceso(self, clave, posicion):
+        proximo = self.siguiente_uso[posicion]
+        self.proximo[clave] = proximo
+        heapq.heappush(self.monticulo, (-proximo, clave))
+        if len(self.monticulo) > 2 * len(self.proximo) + 64:
+            # Reconstruir sin las entradas viejas para que el montículo no crezca sin límite
+            self.monticulo = [(-proximo, clave) for clave, proximo in self.proximo.items()]
+            heapq.heapify(self.monticulo)
+
+    insertar = acceso
+
+    def conoce(self, posicion):
+        # Sin la traza de preparar() no se sabe cuándo se volverá a usar cada página
+        return self.siguiente_uso is not None and posicion is not None and 0 <= posicion < len(self.siguiente_uso)
+
+    def victima(self):
+        while True:
+            proximo, clave = heapq.heappop(self.monticulo)
+            if self.proximo.get(clave) == -proximo:
+                del self.proximo[clave]
+                return clave
+
+    def quitar(self, clave):
+        self.proximo.pop(clave, None)
+
+
+ALGORITMOS = {
+    "fifo": ReemplazoFIFO,
+    "lru": ReemplazoLRU,
+    "reloj": ReemplazoReloj,
+    "optimo": ReemplazoOptimo,
+}
+
+
+class MemoriaVirtual:
+    # Paginación bajo demanda sobre una Memoria: las páginas lógicas se cargan en un
+    # marco la primera vez que se referencian y, si no quedan marcos libres (o se llegó
+    # a max_marcos), se reemplaza una página residente según el algoritmo elegido.
+    def __init__(self, memoria, algoritmo="lru", max_marcos=None):
+        if algoritmo not in ALGORITMOS:
+            raise ValueError(f"Algoritmo de reemplazo desconocido: {algoritmo}")
+        self.memoria = memoria
+        self.nombre_algoritmo = algoritmo
+        self.algoritmo = ALGORITMOS[algoritmo]()
+        self.optimo = isinstance(self.algoritmo, ReemplazoOptimo)
+        self.max_marcos = memoria.num_paginas if max_marcos is None else max_marcos
+        self.tablas = {}  # ID -> {página lógica: marco} de las páginas residentes
+        self.paginas_logicas = {}  # ID -> número de páginas lógicas de los procesos admitidos
+        self.modificadas = set()
+        self.marcos_usados = 0
+        self.referencias = 0
+        self.fallos = 0
+        self.reemplazos = 0
+        self.escrituras_swap = 0
+
+    def admitir(self, proceso):
+        # A diferencia de asignar_memoria, no reserva marcos: siempre se admite
+        tamano_pagina = self.memoria.tamano_pagina
+        self.paginas_logicas[proceso.id_proceso] = (proceso.tamano + tamano_pagina - 1) // tamano_pagina
+        self.tablas.setdefault(proceso.id_proceso, {})
+        return True
+
+    def referenciar(self, proceso_id, pagina, escritura=False, posicion=None):
+        # Devuelve True si la página ya estaba en memoria y False si hubo fallo de página
+        if self.optimo and not self.algoritmo.conoce(posicion):
+            raise ValueError("El algoritmo óptimo necesita la posición de cada referencia en una traza "
+                             "preparada; use simular() con la traza completa.")
+        self.referencias += 1
+        clave = (proceso_id, pagina)
+        tabla = self.tablas.get(proceso_id)
+        if tabla is None:
+            tabla = self.tablas[proceso_id] = {}
+        if pagina in tabla:
+            self.algoritmo.acceso(clave, posicion)
+            if escritura:
+                self.modificadas.add(clave)
+            return True
+
+        limite = self.paginas_logicas.get(proceso_id)
+        if pagina < 0 or (limite is not None and pagina >= limite):
+            raise ValueError(f"La página {pagina} está fuera del espacio lógico del proceso {proceso_id}.")
+
+        self.fallos += 1
+        marco = None
+        if self.marcos_usados < self.max_marcos:
+            marco = self.memoria.tomar_marco(proceso_id, pagina)
+        if marco is None:
+            if not self.marcos_usados:
+                raise ValueError("No hay marcos disponibles para la memoria virtual.")
+            victima = self.algoritmo.victima()
+            marco = self.tablas[victima[0]].pop(victima[1])
+            if victima in self.modificadas:
+                self.modificadas.discard(victima)
+                self.escrituras_swap += 1
+            self.memoria.reemplazar_marco(marco, proceso_id, pagina)
+            self.reemplazos += 1
+        else:
+            self.marcos_usados += 1
+
+        tabla[pagina] = marco
+        self.algoritmo.insertar(clave, posicion)
+        if escritura:
+            self.modificadas.add(clave)
+        return False
+
+    def simular(self, referencias):
+        # referencias: secuencia de (id, página) o (id, página, escritura)
+        if self.optimo:
+            referencias = list(referencias)
+            self.algoritmo.preparar(referencias)
+        referenciar = self.referenciar
+        for posicion, referencia in enumerate(referencias):
+            referenciar(referencia[0], referencia[1], len(referencia) > 2 and referencia[2], posicion)
+        return self.estadisticas()
+
+    def terminar_proceso(self, proceso_id):
+        tabla = self.tablas.pop(proceso_id, {})
+        for pagina, marco in tabla.items():
+            clave = (proceso_id, pagina)
+            self.algoritmo.quitar(clave)
+            self.modificadas.discard(clave)
+            self.memoria.soltar_marco(marco)
+        self.marcos_usados -= len(tabla)
+        self.paginas_logicas.pop(proceso_id, None)
+        return len(tabla)
+
+    def estadisticas(self):
+        aciertos = self.referencias - self.fallos
+        return {
+            "algoritmo": self.nombre_algoritmo,
+            "referencias": self.referencias,
+            "fallos": self.fallos,
+            "aciertos": aciertos,
+            "tasa_fallos": self.fallos / self.referencias if self.referencias else 0.0,
+            "tasa_aciertos": aciertos / self.referencias if self.referencias else 0.0,
+            "reemplazos": self.reemplazos,
+            "escrituras_swap": self.escrituras_swap,
+            "marcos_usados": self.marcos_usados,
+        }
+
+
+def intercalar(cadenas, rafaga=1):
+    # Mezcla las cadenas de referencias de cada proceso por turnos de "rafaga" referencias
+    iteradores = [(proceso_id, iter(paginas)) for proceso_id, paginas in cadenas.items()]
+    while iteradores:
+        activos = []
+        for proceso_id, paginas in iteradores:
+            agotado = False
+            for _ in range(rafaga):
+                pagina = next(paginas, None)
+                if pagina is None:
+                    agotado = True
+                    break
+                yield (proceso_id, pagina)
+            if not agotado:
+                activos.append((proceso_id, paginas))
+        iteradores = activos
+
+
+def leer_cadenas(archivo):
+    # Una línea por proceso: "id: p1 p2 p3 ..."; una "w" tras la página indica escritura (p. ej. "7w")
+    cadenas = {}
+    for linea in archivo:
+        if not linea.strip() or linea.startswith("#"):
+            continue
+        proceso_id, paginas = linea.split(":", 1)
+        cadenas.setdefault(int(proceso_id), []).extend(
+            (int(pagina.rstrip("w")), True) if pagina.endswith("w") else (int(pagina), False)
+            for pagina in paginas.split())
+    return cadenas
+
+
+def leer_referencias(archivo):
+    # Filas "id,página" o "id,página,w"
+    for fila in csv.reader(archivo):
+        if not fila or fila[0] in ("id", "proceso") or fila[0].startswith("#"):
+            continue
+        yield (int(fila[0]), int(fila[1]), len(fila) > 2 and fila[2].strip() == "w")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paginación bajo demanda con algoritmos de reemplazo")
+    parser.add_argument("traza", help="Referencias 'id,página[,w]' por fila, o cadenas 'id: p1 p2 ...' con --cadenas")
+    parser.add_argument("--cadenas", action="store_true", help="La traza tiene una cadena de referencias por proceso")
+    parser.add_argument("--rafaga", type=int, default=1, help="Referencias seguidas de cada proceso al intercalar cadenas")
+    parser.add_argument("--marcos", type=int, default=64, help="Marcos de la memoria física")
+    parser.add_argument("--pagina", type=int, default=4, help="Tamaño de página (bytes)")
+    parser.add_argument("--algoritmo", choices=list(ALGORITMOS) + ["todos"], default="todos")
+    args = parser.parse_args(argv)
+
+    with open(args.traza, newline="", encoding="utf-8") as archivo:
+        if args.cadenas:
+            cadenas = leer_cadenas(archivo)
+            referencias = [(proceso_id, pagina, escritura)
+                           for proceso_id, (pagina, escritura) in intercalar(cadenas, args.rafaga)]
+        else:
+            referencias = list(leer_referencias(archivo))
+
+    algoritmos = list(ALGORITMOS) if args.algoritmo == "todos" else [args.algoritmo]
+    for algoritmo in algoritmos:
+        memoria = Memoria(args.marcos * args.pagina, args.pagina, compacta=True)
+        virtual = MemoriaVirtual(memoria, algoritmo)
+        inicio = time.perf_counter()
+        estadisticas = virtual.simular(referencias)
+        transcurrido = time.perf_counter() - inicio
+        print(f"{algoritmo:>7}: fallos {estadisticas['fallos']} de {estadisticas['referencias']} "
+              f"(tasa de fallos {estadisticas['tasa_fallos']:.4f}, aciertos {estadisticas['tasa_aciertos']:.4f}), "
+              f"escrituras a swap {estadisticas['escrituras_swap']}, {transcurrido:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+import argparse
+import csv
+import heapq
+import json
+import sys
+import time
+
+from cargas import abrir_traza
+import instrumentacion
+from memoria import Memoria, Proceso
+from politicas import POLITICAS
+from puntos_control import PuntosControl, restaurar, sin_recolector
+
+
+class MotorSimulacion:
+    # Lógica de la simulación de memoria paginada sin interfaz gráfica.
+    # La usan tanto SimulacionApp como la línea de comandos.
+    def __init__(self, tamano_total, tamano_pagina, compacta=False, max_historial=None, archivo_historial=None,
+                 politica="primer_ajuste"):
+        self.memoria = Memoria(tamano_total, tamano_pagina, compacta, max_historial, archivo_historial, politica)
+        self.procesos = {}
+        # Montículo de (tiempo de vencimiento, orden de creación, proceso)
+        self.vencimientos = []
+        self.contador_vencimientos = 0
+        self.procesos_admitidos = 0
+        self.procesos_rechazados = 0
+        self.procesos_finalizados = 0
+        self.eventos_procesados = 0
+        self.eventos_invalidos = 0
+        self.puntos_control = None
+
+    def crear_proceso(self, id_proceso, tamano, tiempo_vida=None):
+        if id_proceso in self.procesos:
+            raise ValueError("Ya existe un proceso con ese ID.")
+
+        nuevo_proceso = Proceso(id_proceso, tamano, self.memoria.tiempo_actual, tiempo_vida)
+        asignado, num_paginas = self.memoria.asignar_memoria(nuevo_proceso)
+        if asignado:
+            self.procesos[id_proceso] = nuevo_proceso
+            self.procesos_admitidos += 1
+            if tiempo_vida is not None:
+                vencimiento = nuevo_proceso.tiempo_llegada + tiempo_vida
+                heapq.heappush(self.vencimientos, (vencimiento, self.contador_vencimientos, nuevo_proceso))
+                self.contador_vencimientos += 1
+        else:
+            self.procesos_rechazados += 1
+        return asignado, num_paginas
+
+    def eliminar_proceso(self, id_proceso):
+        # Devuelve las páginas liberadas, o None si el proceso no existe
+        proceso = self.procesos.pop(id_proceso, None)
+        if proceso is None:
+            return None
+        return self.memoria.desasignar_memoria(proceso)
+
+    @instrumentacion.medir("motor_avanzar_tiempo", "Duración de MotorSimulacion.avanzar_tiempo")
+    def avanzar_tiempo(self, pasos):
+        # Devuelve (tiempo, proceso) por cada proceso que finalizó durante el avance.
+        # Salta directamente de un vencimiento al siguiente en lugar de recorrer
+        # todos los procesos en cada paso de tiempo.
+        finalizados = []
+        if pasos <= 0:
+            return finalizados
+
+        primer_paso = self.memoria.tiempo_actual + 1
+        destino = self.memoria.tiempo_actual + pasos
+        while self.vencimientos and self.vencimientos[0][0] <= destino:
+            vencimiento, _, proc = heapq.heappop(self.vencimientos)
+            # Las entradas de procesos ya eliminados se descartan al salir del montículo
+            if self.procesos.get(proc.id_proceso) is not proc:
+                continue
+            self.memoria.tiempo_actual = max(vencimiento, primer_paso)
+            self.memoria.desasignar_memoria(proc)
+            del self.procesos[proc.id_proceso]
+            finalizados.append((self.memoria.tiempo_actual, proc))
+
+        self.memoria.tiempo_actual = destino
+        self.procesos_finalizados += len(finalizados)
+        instrumentacion.contar("procesos_finalizados", len(finalizados))
+        return finalizados
+
+    def reiniciar(self, nuevo_tamano_total, politica=None):
+        for proc in self.procesos.values():
+            self.memoria.desasignar_memoria(proc)
+        self.procesos = {}
+        self.vencimientos = []
+        self.memoria.reiniciar_memoria(nuevo_tamano_total, politica)
+
+    def procesar_evento(self, evento):
+        tipo = evento[0]
+        try:
+            if tipo == "crear":
+                self.crear_proceso(evento[1], evento[2], evento[3])
+            elif tipo == "eliminar":
+                if self.eliminar_proceso(evento[1]) is None:
+                    self.eventos_invalidos += 1
+            elif tipo == "avanzar":
+                self.avanzar_tiempo(evento[1])
+            else:
+                self.eventos_invalidos += 1
+        except ValueError:
+            self.eventos_invalidos += 1
+        self.eventos_procesados += 1
+
+    def ejecutar(self, eventos):
+        for evento in eventos:
+            self.procesar_evento(evento)
+
+    def contadores(self):
+        return {
+            "procesos_admitidos": self.procesos_admitidos,
+            "procesos_rechazados": self.procesos_rechazados,
+            "procesos_finalizados": self.procesos_finalizados,
+            "eventos_procesados": self.eventos_procesados,
+            "eventos_invalidos": self.eventos_invalidos,
+        }
+
+    def guardar_punto_control(self, ruta, completo=False):
+        # El primero de cada motor es completo; los siguientes solo llevan los cambios
+        if self.puntos_control is None:
+            self.puntos_control = PuntosControl(self.memoria)
+        return self.puntos_control.guardar(ruta, self.procesos.values(), self.contadores(), completo)
+
+    def estadisticas(self):
+        memoria = self.memoria
+        paginas_libres = len(memoria.paginas_libres)
+        paginas_ocupadas = memoria.num_paginas - paginas_libres
+        estadisticas = {
+            "eventos_procesados": self.eventos_procesados,
+            "eventos_invalidos": self.eventos_invalidos,
+            "tiempo_actual": memoria.tiempo_actual,
+            "procesos_activos": len(self.procesos),
+            "procesos_admitidos": self.procesos_admitidos,
+            "procesos_rechazados": self.procesos_rechazados,
+            "procesos_finalizados": self.procesos_finalizados,
+            "num_paginas": memoria.num_paginas,
+            "paginas_libres": paginas_libres,
+            "ocupacion": paginas_ocupadas / memoria.num_paginas if memoria.num_paginas else 0.0,
+            "politica": memoria.politica,
+        }
+        estadisticas.update(memoria.metricas.resumen())
+        return estadisticas
+
+
+def restaurar_motor(ruta, max_historial=None, archivo_historial=None):
+    # Motor con la memoria y los procesos de un punto de control; los vencimientos pendientes
+    # se reconstruyen a partir de los procesos activos. El motor se crea vacío y sin archivo de
+    # historial: el volcado ya lo abrió restaurar() para la memoria que lo sustituye.
+    memoria, procesos, contadores = restaurar(ruta, max_historial, archivo_historial)
+    motor = MotorSimulacion(0, memoria.tamano_pagina, memoria.compacta, politica=memoria.politica)
+    motor.memoria = memoria
+    with sin_recolector():
+        motor.procesos = {proceso.id_proceso: proceso for proceso in procesos}
+        motor.vencimientos = [(proceso.tiempo_llegada + proceso.tiempo_vida, orden, proceso)
+                              for orden, proceso in enumerate(proceso for proceso in procesos
+                                                              if proceso.tiempo_vida is not None)]
+    motor.contador_vencimientos = len(motor.vencimientos)
+    heapq.heapify(motor.vencimientos)
+    for clave, valor in (contadores or {}).items():
+        setattr(motor, clave, valor)
+    return motor
+
+
+def ejecutar_con_puntos_control(motor, eventos, ruta, cada):
+    # Cada "cada" eventos guarda ruta.0 (completo), ruta.1, ruta.2... (incrementales).
+    # Devuelve la ruta del último, que es el que hay que pasar a --restaurar.
+    numero = 0
+    for indice, evento in enumerate(eventos, 1):
+        motor.procesar_evento(evento)
+        if indice % cada == 0:
+            motor.guardar_punto_control(f"{ruta}.{numero}")
+            numero += 1
+    motor.guardar_punto_control(f"{ruta}.{numero}")
+    return f"{ruta}.{numero}"
+
+
+def convertir_evento(tipo, campos):
+    # Normaliza un evento de la traza a una tupla:
+    #   ("crear", id, tamano, tiempo_vida), ("eliminar", id) o ("avanzar", pasos)
+    if tipo == "crear":
+        tiempo_vida = campos[2] if len(campos) > 2 else None
+        tiempo_vida = None if tiempo_vida in (None, "", -1, "-1") else int(tiempo_vida)
+        return ("crear", int(campos[0]), int(campos[1]), tiempo_vida)
+    if tipo == "eliminar":
+        return ("eliminar", int(campos[0]))
+    if tipo == "avanzar":
+        return ("avanzar", int(campos[0]) if campos else 1)
+    raise ValueError(f"Evento desconocido: {tipo}")
+
+
+def convertir_o_invalido(tipo, campos):
+    # Una fila mal formada no detiene la simulación: llega al motor como evento inválido
+    try:
+        return convertir_evento(tipo, campos)
+    except (ValueError, TypeError, IndexError):
+        return ("invalido", tipo, campos)
+
+
+def leer_traza_csv(archivo):
+    # Filas "crear,id,tamano,vida", "eliminar,id" y "avanzar,pasos"; cabecera opcional
+    for fila in csv.reader(archivo):
+        if not fila or fila[0] == "evento" or fila[0].startswith("#"):
+            continue
+        yield convertir_o_invalido(fila[0].strip(), fila[1:])
+
+
+def leer_traza_jsonl(archivo):
+    # Objetos {"evento": "crear", "id": 1, "tamano": 32, "vida": 5},
+    # {"evento": "eliminar", "id": 1} y {"evento": "avanzar", "pasos": 3}
+    for linea in archivo:
+        if not linea.strip():
+            continue
+        try:
+            registro = json.loads(linea)
+            tipo = registro["evento"]
+            if tipo == "crear":
+                campos = [registro["id"], registro["tamano"], registro.get("vida")]
+            elif tipo == "eliminar":
+                campos = [registro["id"]]
+            else:
+                campos = [registro.get("pasos", 1)]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            yield ("invalido", linea)
+            continue
+        yield convertir_o_invalido(tipo, campos)
+
+
+def leer_traza(archivo, formato):
+    if formato == "jsonl":
+        return leer_traza_jsonl(archivo)
+    return leer_traza_csv(archivo)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación de memoria paginada por lotes, sin interfaz gráfica")
+    parser.add_argument("traza", help="Archivo de eventos (.csv o .jsonl, opcionalmente .gz); '-' para leer de la entrada estándar")
+    parser.add_argument("--memoria", type=int, default=64, help="Tamaño total de la memoria (bytes)")
+    parser.add_argument("--pagina", type=int, default=4, help="Tamaño de página (bytes)")
+    parser.add_argument("--compacta", action="store_true", help="Usar la representación compacta de Memoria")
+    parser.add_argument("--politica", choices=list(POLITICAS), default="primer_ajuste",
+                        help="Política de ubicación de las páginas")
+    parser.add_argument("--huecos", action="store_true", help="Mostrar el histograma de tramos libres al terminar")
+    parser.add_argument("--max-historial", type=int, default=1000,
+                        help="Entradas del historial que se conservan en memoria (0 = sin límite)")
+    parser.add_argument("--volcado-historial", help="Archivo JSONL donde se vuelcan las entradas antiguas del historial")
+    parser.add_argument("--formato", choices=["csv", "jsonl"], help="Formato de la traza (por defecto, según la extensión)")
+    parser.add_argument("--restaurar", help="Continuar desde un punto de control en lugar de una memoria vacía")
+    parser.add_argument("--punto-control", help="Archivo donde guardar el estado final de la memoria")
+    parser.add_argument("--cada", type=int, help="Con --punto-control, guardar uno incremental cada N eventos (ruta.0, ruta.1...)")
+    parser.add_argument("--metricas", help="Archivo JSON donde se vuelcan periódicamente las métricas de instrumentación")
+    parser.add_argument("--intervalo-metricas", type=float, default=5.0, help="Segundos entre volcados de --metricas")
+    parser.add_argument("--perfil", help="Archivo donde guardar las pilas del perfilador por muestreo (formato plegado)")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or ("jsonl" if args.traza.removesuffix(".gz").endswith((".jsonl", ".json")) else "csv")
+    if args.restaurar:
+        motor = restaurar_motor(args.restaurar, args.max_historial or None, args.volcado_historial)
+    else:
+        motor = MotorSimulacion(args.memoria, args.pagina, args.compacta,
+                                args.max_historial or None, args.volcado_historial, args.politica)
+
+    volcado = None
+    if args.metricas:
+        instrumentacion.activar()
+        volcado = instrumentacion.VolcadoPeriodico(args.metricas, args.intervalo_metricas)
+        volcado.iniciar()
+    if args.perfil:
+        instrumentacion.perfilador.iniciar()
+
+    eventos_previos = motor.eventos_procesados  # Los de un punto de control restaurado no cuentan
+    archivo = abrir_traza(args.traza)
+    try:
+        inicio = time.perf_counter()
+        if args.punto_control and args.cada:
+            ultimo_punto = ejecutar_con_puntos_control(motor, leer_traza(archivo, formato), args.punto_control, args.cada)
+        else:
+            motor.ejecutar(leer_traza(archivo, formato))
+            if args.punto_control:
+                motor.guardar_punto_control(args.punto_control)
+                ultimo_punto = args.punto_control
+        transcurrido = time.perf_counter() - inicio
+    finally:
+        if archivo is not sys.stdin:
+            archivo.close()
+        if volcado is not None:
+            volcado.detener()
+        if args.perfil:
+            instrumentacion.perfilador.detener()
+            with open(args.perfil, "w", encoding="utf-8") as salida:
+                salida.write(instrumentacion.perfilador.plegado())
+
+    estadisticas = motor.estadisticas()
+    eventos = estadisticas["eventos_procesados"] - eventos_previos
+    print(f"Eventos procesados: {eventos} en {transcurrido:.3f} s "
+          f"({eventos / transcurrido if transcurrido > 0 else 0:,.0f} eventos/s)")
+    for clave, valor in estadisticas.items():
+        if clave != "eventos_procesados":
+            print(f"{clave}: {valor:.4f}" if isinstance(valor, float) else f"{clave}: {valor}")
+    print(f"histograma_latencias_us: {dict(sorted(motor.memoria.metricas.histograma_latencias.items()))}")
+    if args.huecos:
+        print(f"histograma_huecos: {motor.memoria.histograma_huecos()}")
+    if args.punto_control:
+        print(f"punto_control: {ultimo_punto}")
+
+
+if __name__ == "__main__":
+    main()
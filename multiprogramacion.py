@@ -1,173 +1,390 @@
 import dash
-from dash import dcc, html, dash_table
+from dash import dcc, html, dash_table, Patch
 from dash.dependencies import Input, Output, State
 import plotly.graph_objs as go
-import threading
-import time
+from itertools import islice
+import os
 import random
-import pandas as pd
+import time
+import uuid
+
+from cargas import Carga, Uniforme
+import instrumentacion
+from particiones import AJUSTES, MODOS, MemoriaParticionada
+from planificador import Planificador, POLITICAS_PLANIFICACION
+from sesiones import AlmacenDisco, GestorSesiones
 
 # Configuración inicial
-total_processes = []
-running_processes = []
-process_colors = {}
-running = False
-total_memory = 100  # Memoria total del sistema
-allocated_memory = 0  # Memoria actualmente en uso
-
-def generate_process(pid=None, burst_time=None, memory=None):
-    pid = pid if pid else len(total_processes) + 1
-    color = generate_unique_color()
-    process_colors[pid] = color
-    mem_required = memory if memory else random.randint(5, 20)
-    burst_time = burst_time if burst_time else random.randint(3, 10)
+PAGE_SIZE = 50  # Filas por página de la tabla de procesos
+
+
+class SimulationSession:
+    # Estado de la simulación de una sesión (una pestaña del navegador)
+    def __init__(self, total_memory=100):
+        self.total_processes = {}  # PID -> proceso; el planificador comparte los mismos diccionarios
+        self.process_colors = {}
+        self.used_colors = set()
+        self.memory_config = {"tamano_total": total_memory, "modo": "variable", "ajuste": "primer",
+                              "particiones": None, "compactacion": False}
+        self.memory = MemoriaParticionada(**self.memory_config)
+        # Tamaños, ráfagas y prioridades de los procesos aleatorios
+        self.workload = Carga(tamanos=Uniforme(5, 20), duraciones=Uniforme(3, 10), prioridades=Uniforme(1, 5))
+        self.version = 0  # Aumenta cuando entran procesos a la cola de espera, cambia la memoria o el aviso
+        self.rejected = 0  # Procesos que no caben ni en la memoria vacía
+        self.notice = ""  # Por qué no se hizo la última acción pedida
+        self.planificador = Planificador(al_terminar=self.release_memory)
+        self.running = False
+        self.last_tick = None  # Instante (time.time) hasta el que ya se simuló
+
+    def admit(self, process):
+        # Los procesos que no caben esperan en la cola de la memoria hasta que se libere espacio;
+        # los que no cabrían nunca (o piden una memoria no positiva) se rechazan y se cuentan
+        if process["Memory"] <= 0:
+            return self.reject(process, f"Proceso de {process['Memory']} MB rechazado: la memoria debe ser positiva")
+        if process["Memory"] > self.memory.mayor_bloque:
+            return self.reject(process, f"Proceso de {process['Memory']} MB rechazado: el mayor bloque de la memoria "
+                                        f"es de {self.memory.mayor_bloque} MB")
+        self.notify("")
+        process.setdefault("Arrival Time", self.planificador.tiempo)
+        self.total_processes[process["PID"]] = process
+        if self.memory.solicitar(process["PID"], process["Memory"], self.planificador.tiempo, process):
+            self.planificador.agregar(process)
+        else:
+            self.version += 1
+        return True
+
+    def reject(self, process, notice):
+        # Nada de la sesión cambia salvo el contador y el aviso
+        self.rejected += 1
+        self.used_colors.discard(self.process_colors.pop(process["PID"], None))
+        self.notice = notice
+        self.version += 1
+        return False
+
+    def notify(self, notice):
+        if notice != self.notice:
+            self.notice = notice
+            self.version += 1
+
+    def release_memory(self, process):
+        # El planificador llama a esta función (con su lock tomado) cuando un proceso termina
+        for _, admitted in self.memory.liberar(process["PID"], self.planificador.tiempo):
+            self.planificador.agregar(admitted)
+
+    def configure_memory(self, **config):
+        # Solo se cambia la memoria cuando no hay procesos en ella ni esperando
+        if self.memory.asignados or self.memory.cola_espera:
+            self.notify("No se puede cambiar la memoria mientras haya procesos en ella o esperando")
+            return False
+        self.memory = MemoriaParticionada(**dict(self.memory_config, **config))
+        self.memory_config.update(config)
+        self.notice = ""
+        self.version += 1
+        return True
+
+    def clear(self):
+        self.planificador.limpiar()
+        self.total_processes.clear()
+        self.process_colors.clear()
+        self.used_colors.clear()
+        self.memory = MemoriaParticionada(**self.memory_config)
+        self.rejected = 0
+        self.notice = ""
+        self.version += 1
+
+    def start(self):
+        if not self.running:
+            self.running = True
+            self.last_tick = time.time()
+
+    def stop(self):
+        self.catch_up()
+        self.running = False
+
+    def catch_up(self, now=None):
+        # En lugar de un hilo por sesión, que no sobrevive a varios procesos servidores,
+        # en cada petición se simulan de golpe los ticks transcurridos desde la anterior
+        if not self.running:
+            return
+        now = time.time() if now is None else now
+        seconds_per_tick = self.planificador.segundos_por_tick
+        ticks = int((now - self.last_tick) / seconds_per_tick)
+        if ticks > 0:
+            self.planificador.avanzar(ticks)
+            self.last_tick += ticks * seconds_per_tick
+
+
+# Con MULTIPROGRAMACION_SESIONES=<directorio> las sesiones se guardan en disco y la app puede
+# servirse con varios procesos, p. ej. "gunicorn -w 4 multiprogramacion:server"
+sessions_dir = os.environ.get("MULTIPROGRAMACION_SESIONES")
+sessions = GestorSesiones(SimulationSession, AlmacenDisco(sessions_dir) if sessions_dir else None)
+
+def generate_process(session, pid=None, burst_time=None, memory=None, priority=None):
+    pid = pid if pid else len(session.total_processes) + 1
+    color = generate_unique_color(session)
+    session.process_colors[pid] = color
+    random_memory, random_burst_time, random_priority = session.workload.muestrear()
+    mem_required = memory if memory else random_memory
+    burst_time = burst_time if burst_time else random_burst_time
+    priority = priority if priority else random_priority
     return {
         "PID": pid,
         "Burst Time": burst_time,
         "Remaining Time": burst_time,  # Para la lógica interna
         "Memory": mem_required,
-        "Elapsed Time": 0  # Tiempo transcurrido que incrementará
+        "Elapsed Time": 0,  # Tiempo transcurrido que incrementará
+        "Priority": priority  # Menor número = mayor prioridad
     }
 
-def generate_unique_color():
+def generate_unique_color(session):
     while True:
         color = "rgb(" + ", ".join(map(str, (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))) + ")"
-        if color not in process_colors.values():
+        if color not in session.used_colors:
+            session.used_colors.add(color)
             return color
 
-def run_simulation():
-    global running, allocated_memory
-    while running:
-        if running_processes:
-            for process in running_processes:
-                if process["Remaining Time"] > 0:
-                    process["Remaining Time"] -= 1
-                    process["Elapsed Time"] += 1
-                elif process["Remaining Time"] == 0 and process["Memory"] > 0:
-                    allocated_memory -= process["Memory"]  # Liberamos memoria cuando el proceso finaliza
-                    process["Memory"] = 0  # Evitamos restar varias veces
-        time.sleep(1)
-
-
 # Crear la app Dash
 app = dash.Dash(__name__)
+server = app.server
+
+def serve_layout():
+    # Cada carga de la página recibe su propio identificador de sesión
+    return html.Div([
+        dcc.Store(id="session-id", data=str(uuid.uuid4())),
+        html.H1("Simulación de Multiprogramación con Memoria"),
+
+        html.Div([
+            html.Button("Agregar Proceso Aleatorio", id="add-process", n_clicks=0),
+            html.Button("Agregar Proceso Personalizado", id="add-custom-process", n_clicks=0),
+            html.Button("Iniciar Simulación", id="start-simulation", n_clicks=0),
+            html.Button("Detener Simulación", id="stop-simulation", n_clicks=0),
+            html.Button("Limpiar Procesos", id="clear-processes", n_clicks=0)
+        ]),
+
+        html.Div([
+            html.Label("Burst Time:"),
+            dcc.Input(id="input-burst-time", type="number", min=1, step=1),
+            html.Label("Memory (MB):"),
+            dcc.Input(id="input-memory", type="number", min=1, step=1),
+            html.Label("Prioridad:"),
+            dcc.Input(id="input-priority", type="number", min=1, step=1)
+        ]),
+
+        html.Div([
+            html.Label("Política:"),
+            dcc.Dropdown(
+                id="input-policy",
+                options=[{"label": nombre, "value": politica} for politica, nombre in POLITICAS_PLANIFICACION.items()],
+                value="fcfs",
+                clearable=False,
+                style={"width": "200px", "display": "inline-block", "verticalAlign": "middle"}
+            ),
+            html.Label("Quantum:"),
+            dcc.Input(id="input-quantum", type="number", min=1, step=1, value=2),
+            html.Label("Ticks por segundo:"),
+            dcc.Input(id="input-speed", type="number", min=1, step=1, value=1),
+            html.Button("Aplicar Planificación", id="update-scheduler", n_clicks=0)
+        ]),
 
-app.layout = html.Div([
-    html.H1("Simulación de Multiprogramación con Memoria"),
-    
-    html.Div([
-        html.Button("Agregar Proceso Aleatorio", id="add-process", n_clicks=0),
-        html.Button("Agregar Proceso Personalizado", id="add-custom-process", n_clicks=0),
-        html.Button("Iniciar Simulación", id="start-simulation", n_clicks=0),
-        html.Button("Detener Simulación", id="stop-simulation", n_clicks=0),
-        html.Button("Limpiar Procesos", id="clear-processes", n_clicks=0)
-    ]),
-    
-    html.Div([
-        html.Label("Burst Time:"),
-        dcc.Input(id="input-burst-time", type="number", min=1, step=1),
-        html.Label("Memory (MB):"),
-        dcc.Input(id="input-memory", type="number", min=1, step=1)
-    ]),
-    
-    html.Label("Memoria Total (MB):"),
-    dcc.Input(id="input-total-memory", type="number", value=100, step=1),
-    html.Button("Actualizar Memoria", id="update-memory", n_clicks=0),
-    
-    dash_table.DataTable(
-        id="process-table",
-        columns=[
-            {"name": "PID", "id": "PID"},
-            {"name": "Burst Time", "id": "Burst Time"},
-            {"name": "Tiempo restante", "id": "Tiempo_restante"},
-            {"name": "Memory", "id": "Memory"}
-        ],
-        data=[]
-    ),
-    
-    dcc.Interval(
-        id="interval-update",
-        interval=1000,
-        n_intervals=0,
-        disabled=True
-    ),
-    
-    dcc.Graph(id="process-graph"),
-    dcc.Graph(id="memory-graph")
-])
+        html.Div([
+            html.Label("Memoria Total (MB):"),
+            dcc.Input(id="input-total-memory", type="number", value=100, step=1),
+            html.Label("Particiones:"),
+            dcc.Dropdown(
+                id="input-partition-mode",
+                options=[{"label": modo.capitalize(), "value": modo} for modo in MODOS],
+                value="variable",
+                clearable=False,
+                style={"width": "150px", "display": "inline-block", "verticalAlign": "middle"}
+            ),
+            html.Label("Particiones fijas:"),
+            dcc.Input(id="input-partitions", type="number", min=1, step=1, value=4),
+            html.Label("Ajuste:"),
+            dcc.Dropdown(
+                id="input-fit",
+                options=[{"label": ajuste.capitalize() + " ajuste", "value": ajuste} for ajuste in AJUSTES],
+                value="primer",
+                clearable=False,
+                style={"width": "150px", "display": "inline-block", "verticalAlign": "middle"}
+            ),
+            dcc.Checklist(id="input-compaction", options=[{"label": "Compactar", "value": "compactar"}], value=[],
+                          style={"display": "inline-block"}),
+            html.Button("Actualizar Memoria", id="update-memory", n_clicks=0)
+        ]),
+
+        dash_table.DataTable(
+            id="process-table",
+            columns=[
+                {"name": "PID", "id": "PID"},
+                {"name": "Burst Time", "id": "Burst Time"},
+                {"name": "Tiempo restante", "id": "Tiempo_restante"},
+                {"name": "Memory", "id": "Memory"},
+                {"name": "Estado", "id": "Estado"}
+            ],
+            data=[],
+            page_action="custom",
+            page_current=0,
+            page_size=PAGE_SIZE,
+            page_count=1
+        ),
+
+        dcc.Store(id="dashboard-version"),
+
+        html.Div(id="scheduler-metrics"),
+
+        dcc.Interval(
+            id="interval-update",
+            interval=1000,
+            n_intervals=0,
+            disabled=True
+        ),
+
+        dcc.Graph(id="process-graph"),
+        dcc.Graph(id="memory-graph")
+    ])
+
+app.layout = serve_layout
+
+# Métricas de este proceso servidor en formato de Prometheus (con INSTRUMENTACION=1) y,
+# con INSTRUMENTACION_PERFIL=1, las pilas del perfilador por muestreo para un flamegraph
+@server.route("/metrics")
+def metrics():
+    return instrumentacion.texto_prometheus(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+@server.route("/metrics/perfil")
+def profile():
+    return instrumentacion.perfilador.plegado(), 200, {"Content-Type": "text/plain; charset=utf-8"}
 
 @app.callback(
-    [Output("process-table", "data"), Output("process-graph", "figure"), Output("memory-graph", "figure"), Output("interval-update", "disabled")],
-    [Input("add-process", "n_clicks"), Input("add-custom-process", "n_clicks"), Input("start-simulation", "n_clicks"), Input("stop-simulation", "n_clicks"), Input("clear-processes", "n_clicks"), Input("update-memory", "n_clicks"), Input("interval-update", "n_intervals")],
-    [State("input-burst-time", "value"), State("input-memory", "value"), State("input-total-memory", "value")]
+    [Output("process-table", "data"), Output("process-table", "page_count"), Output("process-graph", "figure"), Output("memory-graph", "figure"),
+     Output("interval-update", "disabled"), Output("scheduler-metrics", "children"), Output("dashboard-version", "data")],
+    [Input("add-process", "n_clicks"), Input("add-custom-process", "n_clicks"), Input("start-simulation", "n_clicks"), Input("stop-simulation", "n_clicks"), Input("clear-processes", "n_clicks"), Input("update-memory", "n_clicks"), Input("update-scheduler", "n_clicks"), Input("interval-update", "n_intervals"),
+     Input("process-table", "page_current")],
+    [State("input-burst-time", "value"), State("input-memory", "value"), State("input-priority", "value"), State("input-total-memory", "value"),
+     State("input-partition-mode", "value"), State("input-partitions", "value"), State("input-fit", "value"), State("input-compaction", "value"),
+     State("input-policy", "value"), State("input-quantum", "value"), State("input-speed", "value"), State("process-table", "page_size"), State("dashboard-version", "data"),
+     State("session-id", "data")]
 )
-def update_dashboard(add_clicks, add_custom_clicks, start_clicks, stop_clicks, clear_clicks, update_mem_clicks, n_intervals, burst_time, memory, new_total_memory):
-    global running, allocated_memory, total_memory
+@instrumentacion.medir("panel_update_dashboard", "Duración del callback update_dashboard")
+def update_dashboard(add_clicks, add_custom_clicks, start_clicks, stop_clicks, clear_clicks, update_mem_clicks, update_sched_clicks, n_intervals, page_current,
+                     burst_time, memory, priority, new_total_memory, partition_mode, partitions, fit, compaction, policy, quantum, speed, page_size, seen_version, session_id):
     ctx = dash.callback_context
-    if not ctx.triggered:
-        return total_processes, update_graph(), update_memory_graph(), not running
-    
-    trigger_id = ctx.triggered[0]["prop_id"].split(".")[0]
-    
-    if trigger_id == "add-process":
-        new_process = generate_process()
-        if allocated_memory + new_process["Memory"] <= total_memory:
-            total_processes.append(new_process)
-            running_processes.append(new_process.copy())
-            allocated_memory += new_process["Memory"]
-    elif trigger_id == "add-custom-process" and burst_time and memory:
-        new_process = generate_process(burst_time=burst_time, memory=memory)
-        if allocated_memory + new_process["Memory"] <= total_memory:
-            total_processes.append(new_process)
-            running_processes.append(new_process.copy())
-            allocated_memory += new_process["Memory"]
-    elif trigger_id == "update-memory" and new_total_memory:
-        total_memory = new_total_memory
-    elif trigger_id == "start-simulation" and not running:
-        running = True
-        threading.Thread(target=run_simulation, daemon=True).start()
-    elif trigger_id == "stop-simulation":
-        running = False
-    elif trigger_id == "clear-processes":
-        total_processes.clear()
-        running_processes.clear()
-        process_colors.clear()
-        allocated_memory = 0
-
-    # Formatear los datos para la tabla
-    table_data = []
-    for process in total_processes:
-        # Buscamos el proceso correspondiente en running_processes para obtener el tiempo actualizado
-        running_process = next((p for p in running_processes if p["PID"] == process["PID"]), process)
-        table_data.append({
-            "PID": process["PID"],
-            "Burst Time": process["Burst Time"],
-            "Tiempo_restante": running_process["Remaining Time"],
-            "Memory": process["Memory"]
-        })
-    
-    return table_data, update_graph(), update_memory_graph(), not running
-
-def update_graph():
-    df = pd.DataFrame(running_processes)
-    if df.empty:
-        return go.Figure()
-    
-    fig = go.Figure(
-        data=[go.Bar(x=df["PID"], y=df["Remaining Time"], name="Tiempo Restante", marker=dict(color=[process_colors[pid] for pid in df["PID"]]))],
-        layout=go.Layout(
-            title="Procesos en Ejecución",
-            xaxis_title="ID del Proceso",
-            yaxis_title="Tiempo Restante (s)",
-            barmode="group"
-        )
-    )
-    return fig
+    trigger_id = ctx.triggered[0]["prop_id"].split(".")[0] if ctx.triggered else None
+
+    # Las peticiones de una misma sesión pueden llegar a la vez, incluso a procesos distintos:
+    # el cerrojo de la sesión cubre desde que se carga hasta que se guarda
+    with sessions.usar(session_id) as session:
+        planificador = session.planificador
+        session.catch_up()
+        if trigger_id == "add-process":
+            session.admit(generate_process(session))
+        elif trigger_id == "add-custom-process" and burst_time and memory:
+            session.admit(generate_process(session, burst_time=burst_time, memory=memory, priority=priority))
+        elif trigger_id == "update-memory" and new_total_memory and new_total_memory > 0:
+            partitions = min(partitions or 4, new_total_memory)
+            session.configure_memory(tamano_total=new_total_memory, modo=partition_mode, ajuste=fit,
+                                     particiones=[new_total_memory // partitions] * partitions if partition_mode == "fija" else None,
+                                     compactacion="compactar" in (compaction or []))
+        elif trigger_id == "update-scheduler":
+            planificador.cambiar_politica(policy, quantum if quantum else None)
+            if speed:
+                planificador.segundos_por_tick = 1.0 / speed
+        elif trigger_id == "start-simulation":
+            session.start()
+        elif trigger_id == "stop-simulation":
+            session.stop()
+        elif trigger_id == "clear-processes":
+            session.clear()
 
-def update_memory_graph():
-    used_memory = allocated_memory
-    free_memory = total_memory - used_memory
+        # Versión de lo que ya tiene este navegador: solo se envían las salidas que cambiaron
+        page_current = page_current or 0
+        page_size = page_size or PAGE_SIZE
+        version = {
+            "estado": [planificador.version, session.version],
+            "procesos": planificador.version_procesos,
+            "memoria": [session.memory.ocupada, session.memory.tamano_total],
+            "tiempo": planificador.tiempo,
+            "pagina": [page_current, page_size],
+        }
+        seen_version = seen_version or {}
 
+        def changed(*keys):
+            return any(seen_version.get(key) != version[key] for key in keys)
+
+        table_data = table_page(session, page_current, page_size) if changed("estado", "pagina") else dash.no_update
+        page_count = max((len(session.total_processes) + page_size - 1) // page_size, 1) if changed("estado", "pagina") else dash.no_update
+        process_figure = dash.no_update
+        if changed("estado"):
+            process_figure = update_graph(session, only_values=not changed("procesos"))
+        memory_figure = update_memory_graph(session, only_values="memoria" in seen_version) if changed("memoria") else dash.no_update
+        metrics = update_metrics(session) if changed("estado", "tiempo") else dash.no_update
+
+        return table_data, page_count, process_figure, memory_figure, not session.running, metrics, version
+
+def table_page(session, page_current, page_size):
+    # Solo se envían al navegador las filas de la página visible
+    inicio = page_current * page_size
+    return [{
+        "PID": process["PID"],
+        "Burst Time": process["Burst Time"],
+        "Tiempo_restante": process["Remaining Time"],
+        "Memory": process["Memory"],
+        "Estado": process_state(session, process["PID"])
+    } for process in islice(session.total_processes.values(), inicio, inicio + page_size)]
+
+def process_state(session, pid):
+    if pid in session.planificador.completados:
+        return "Terminado"
+    if pid in session.memory.asignados:
+        return "En memoria"
+    return "En espera"
+
+def update_metrics(session):
+    metricas = session.planificador.metricas()
+    memoria = session.memory.metricas()
+    return (f"Política: {POLITICAS_PLANIFICACION[session.planificador.politica]} | Tiempo: {metricas['tiempo']} | "
+            f"Completados: {metricas['completados']} | Espera media: {metricas['espera_media']:.2f} | "
+            f"Retorno medio: {metricas['retorno_medio']:.2f} | Utilización CPU: {metricas['utilizacion_cpu']:.0%} | "
+            f"Memoria {memoria['modo']}/{memoria['ajuste']}: en espera {memoria['en_espera']}, "
+            f"espera media {memoria['espera_media']:.2f}, fragmentación externa {memoria['fragmentacion_externa']:.0%}, "
+            f"interna {memoria['fragmentacion_interna']} MB, compactaciones {memoria['compactaciones']}, "
+            f"rechazados {session.rejected}" + (f" | {session.notice}" if session.notice else ""))
+
+def update_graph(session, only_values=False):
+    # Si los procesos activos son los mismos, basta con actualizar las alturas de las barras
+    planificador = session.planificador
+    processes = planificador.activos()
+    if only_values and processes:
+        patch = Patch()
+        patch["data"][0]["y"] = [process["Remaining Time"] for process in processes]
+        return patch
+    if not processes:
+        return {"data": [], "layout": {}}
+    # Diccionario en lugar de go.Figure: validar miles de colores es lo que más tarda
+    return {
+        "data": [{
+            "type": "bar",
+            "x": [process["PID"] for process in processes],
+            "y": [process["Remaining Time"] for process in processes],
+            "name": "Tiempo Restante",
+            "marker": {"color": [session.process_colors[process["PID"]] for process in processes]}
+        }],
+        "layout": {
+            "title": {"text": "Procesos en Ejecución"},
+            "xaxis": {"title": {"text": "ID del Proceso"}},
+            "yaxis": {"title": {"text": "Tiempo Restante (s)"}},
+            "barmode": "group"
+        }
+    }
+
+def update_memory_graph(session, only_values=False):
+    used_memory = session.memory.ocupada
+    free_memory = session.memory.tamano_total - used_memory
+
+    if only_values:
+        patch = Patch()
+        patch["data"][0]["values"] = [used_memory, free_memory]
+        return patch
     fig = go.Figure(
         data=[go.Pie(labels=["Usada", "Libre"], values=[used_memory, free_memory], hole=0.4, 
                      marker=dict(colors=["red", "green"]))],
@@ -175,6 +392,5 @@ def update_memory_graph():
     )
     return fig
 
-
 if __name__ == "__main__":
     app.run_server(debug=True)
\ No newline at end of file
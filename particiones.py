@@ -0,0 +1,318 @@
+import argparse
+from bisect import bisect_left, insort
+from collections import deque
+import random
+
+from planificador import Planificador, POLITICAS_PLANIFICACION
+
+
+AJUSTES = ("primer", "mejor", "peor")
+MODOS = ("variable", "fija")
+
+
+class MemoriaParticionada:
+    # Asignación contigua de memoria. En modo "variable" cada proceso recibe un bloque
+    # del tamaño que pide, cortado de un hueco libre; al liberar se fusiona con los
+    # huecos vecinos. En modo "fija" la memoria se divide de antemano en particiones
+    # y cada proceso ocupa una entera (lo que sobra es fragmentación interna).
+    # Los huecos se guardan ordenados por dirección (para las fusiones) y por tamaño (para
+    # encontrar el mejor o el peor en O(log n)). El primer ajuste usa además un árbol de
+    # máximos sobre las direcciones: cada nodo guarda el mayor hueco que empieza en su rango,
+    # así que el primero que alcanza se encuentra bajando desde la raíz en O(log tamaño).
+    # Los procesos que no caben esperan en una cola y se reintentan al liberar memoria.
+    def __init__(self, tamano_total, modo="variable", ajuste="primer", particiones=None, compactacion=False):
+        if modo not in MODOS:
+            raise ValueError(f"Modo de particionado desconocido: {modo}")
+        if ajuste not in AJUSTES:
+            raise ValueError(f"Ajuste desconocido: {ajuste}")
+        if modo == "fija":
+            particiones = particiones or [tamano_total // 4] * 4
+            if sum(particiones) > tamano_total or min(particiones) <= 0:
+                raise ValueError("Las particiones fijas no caben en la memoria total.")
+        self.tamano_total = tamano_total
+        self.mayor_bloque = max(particiones) if modo == "fija" else tamano_total
+        self.modo = modo
+        self.ajuste = ajuste
+        self.compactacion = compactacion and modo == "variable"
+        self.huecos = {}  # inicio -> tamaño
+        self.hojas = 1 << max(tamano_total - 1, 0).bit_length()
+        self.maximos = [0] * (2 * self.hojas) if ajuste == "primer" else None  # Árbol en un array, raíz en 1
+        self.por_direccion = []  # inicios de los huecos, ordenados
+        self.por_tamano = []  # (tamaño, inicio), ordenada
+        self.libre = 0
+        self.asignados = {}  # ID -> (inicio, tamaño del bloque, tamaño pedido)
+        self.cola_espera = deque()  # (ID, tamaño, instante de llegada, dato)
+        self.ocupada = 0  # Memoria pedida por los procesos asignados
+        self.admitidos = 0
+        self.admitidos_tras_espera = 0
+        self.espera_acumulada = 0
+        self.espera_maxima = 0
+        self.compactaciones = 0
+        self.memoria_movida = 0
+
+        if modo == "fija":
+            inicio = 0
+            for tamano in particiones:
+                self.agregar_hueco(inicio, tamano)
+                inicio += tamano
+        elif tamano_total > 0:
+            self.agregar_hueco(0, tamano_total)
+
+    def agregar_hueco(self, inicio, tamano):
+        self.huecos[inicio] = tamano
+        insort(self.por_direccion, inicio)
+        insort(self.por_tamano, (tamano, inicio))
+        self.libre += tamano
+        self.actualizar_maximo(inicio, tamano)
+
+    def quitar_hueco(self, inicio):
+        tamano = self.huecos.pop(inicio)
+        del self.por_direccion[bisect_left(self.por_direccion, inicio)]
+        del self.por_tamano[bisect_left(self.por_tamano, (tamano, inicio))]
+        self.libre -= tamano
+        self.actualizar_maximo(inicio, 0)
+        return tamano
+
+    def actualizar_maximo(self, inicio, tamano):
+        maximos = self.maximos
+        if maximos is None:
+            return
+        nodo = self.hojas + inicio
+        maximos[nodo] = tamano
+        nodo //= 2
+        while nodo:
+            maximos[nodo] = max(maximos[2 * nodo], maximos[2 * nodo + 1])
+            nodo //= 2
+
+    def buscar_hueco(self, tamano):
+        # Inicio del hueco elegido por el ajuste, o None si ninguno alcanza
+        if self.ajuste == "primer":
+            # Se baja por la rama izquierda siempre que en ella haya un hueco que alcance
+            maximos = self.maximos
+            if maximos[1] < tamano:
+                return None
+            nodo = 1
+            while nodo < self.hojas:
+                nodo = 2 * nodo if maximos[2 * nodo] >= tamano else 2 * nodo + 1
+            return nodo - self.hojas
+        indice = bisect_left(self.por_tamano, (tamano, -1))
+        if indice == len(self.por_tamano):
+            return None
+        return self.por_tamano[indice if self.ajuste == "mejor" else -1][1]
+
+    def asignar(self, proceso_id, tamano):
+        inicio = self.buscar_hueco(tamano)
+        if inicio is None and self.compactacion and self.libre >= tamano:
+            self.compactar()
+            inicio = self.buscar_hueco(tamano)
+        if inicio is None:
+            return False
+        bloque = self.quitar_hueco(inicio)
+        if self.modo == "variable":
+            if bloque > tamano:
+                self.agregar_hueco(inicio + tamano, bloque - tamano)
+            bloque = tamano
+        self.asignados[proceso_id] = (inicio, bloque, tamano)
+        self.ocupada += tamano
+        self.admitidos += 1
+        return True
+
+    def solicitar(self, proceso_id, tamano, ahora=0, dato=None):
+        # True si se asignó en el acto; False si el proceso queda en la cola de espera.
+        # Como en atender_cola, entra si cabe aunque otros más grandes sigan esperando.
+        if proceso_id in self.asignados:
+            raise ValueError("Ya existe un proceso con ese ID.")
+        if tamano <= 0 or tamano > self.mayor_bloque:
+            raise ValueError(f"Un proceso de tamaño {tamano} no cabe nunca en esta memoria.")
+        if self.asignar(proceso_id, tamano):
+            return True
+        self.cola_espera.append((proceso_id, tamano, ahora, dato))
+        return False
+
+    def liberar(self, proceso_id, ahora=0):
+        # Libera el bloque del proceso y devuelve [(ID, dato)] de los que entraron desde la cola
+        inicio, bloque, tamano = self.asignados.pop(proceso_id)
+        self.ocupada -= tamano
+        fin = inicio + bloque
+        if self.modo == "variable":
+            indice = bisect_left(self.por_direccion, inicio)
+            if indice > 0:
+                anterior = self.por_direccion[indice - 1]
+                if anterior + self.huecos[anterior] == inicio:
+                    self.quitar_hueco(anterior)
+                    inicio = anterior
+            if fin in self.huecos:
+                fin += self.quitar_hueco(fin)
+        self.agregar_hueco(inicio, fin - inicio)
+        return self.atender_cola(ahora)
+
+    def atender_cola(self, ahora=0):
+        # Se recorre la cola en orden de llegada y entran todos los que ya caben
+        admitidos = []
+        pendientes = deque()
+        while self.cola_espera:
+            if not self.libre:
+                break  # Memoria llena: no entra nadie más
+            proceso_id, tamano, llegada, dato = self.cola_espera.popleft()
+            if self.libre >= tamano and self.asignar(proceso_id, tamano):
+                espera = ahora - llegada
+                self.admitidos_tras_espera += 1
+                self.espera_acumulada += espera
+                self.espera_maxima = max(self.espera_maxima, espera)
+                admitidos.append((proceso_id, dato))
+            else:
+                pendientes.append((proceso_id, tamano, llegada, dato))
+        pendientes.extend(self.cola_espera)
+        self.cola_espera = pendientes
+        return admitidos
+
+    def cancelar(self, proceso_id):
+        # Quita un proceso de la cola de espera; devuelve True si estaba en ella
+        for indice, entrada in enumerate(self.cola_espera):
+            if entrada[0] == proceso_id:
+                del self.cola_espera[indice]
+                return True
+        return False
+
+    def compactar(self):
+        # Desplaza los bloques asignados hacia el inicio, dejando un único hueco al final
+        if self.modo != "variable":
+            raise ValueError("Solo se puede compactar con particiones variables.")
+        siguiente = 0
+        for proceso_id, (inicio, bloque, tamano) in sorted(self.asignados.items(), key=lambda item: item[1][0]):
+            if inicio != siguiente:
+                self.asignados[proceso_id] = (siguiente, bloque, tamano)
+                self.memoria_movida += bloque
+            siguiente += bloque
+        self.huecos.clear()
+        self.por_direccion.clear()
+        self.por_tamano.clear()
+        self.libre = 0
+        if self.maximos is not None:
+            self.maximos = [0] * len(self.maximos)
+        if siguiente < self.tamano_total:
+            self.agregar_hueco(siguiente, self.tamano_total - siguiente)
+        self.compactaciones += 1
+
+    def hueco_mayor(self):
+        return self.por_tamano[-1][0] if self.por_tamano else 0
+
+    def fragmentacion_externa(self):
+        # Parte de la memoria libre que no está en el hueco mayor (0 = toda junta)
+        return 1 - self.hueco_mayor() / self.libre if self.libre else 0.0
+
+    def mapa(self):
+        # Bloques (inicio, tamaño, ID o None si está libre), ordenados por dirección
+        bloques = [(inicio, bloque, proceso_id) for proceso_id, (inicio, bloque, _) in self.asignados.items()]
+        bloques.extend((inicio, tamano, None) for inicio, tamano in self.huecos.items())
+        bloques.sort()
+        return bloques
+
+    def metricas(self):
+        return {
+            "modo": self.modo,
+            "ajuste": self.ajuste,
+            "ocupada": self.ocupada,
+            "libre": self.libre,
+            "huecos": len(self.huecos),
+            "hueco_mayor": self.hueco_mayor(),
+            "fragmentacion_externa": self.fragmentacion_externa(),
+            "fragmentacion_interna": sum(bloque - tamano for _, bloque, tamano in self.asignados.values()),
+            "en_espera": len(self.cola_espera),
+            "admitidos": self.admitidos,
+            "espera_media": self.espera_acumulada / self.admitidos_tras_espera if self.admitidos_tras_espera else 0.0,
+            "espera_maxima": self.espera_maxima,
+            "compactaciones": self.compactaciones,
+            "memoria_movida": self.memoria_movida,
+        }
+
+
+def simular(procesos, tamano_total, modo="variable", ajuste="primer", particiones=None, compactacion=False,
+            politica="fcfs", quantum=2, ventana=None):
+    # Ejecuta una carga de (llegada, ráfaga, memoria) con el planificador y la memoria
+    # particionada en un reloj virtual, y devuelve las métricas de ambos.
+    # Con una sola CPU que nunca para si hay algún proceso en memoria, el rendimiento total
+    # (completados / tiempo) casi no depende del particionado: lo que cambia es cuántos
+    # procesos caben a la vez y cuánto esperan. Por eso también se devuelven los completados
+    # dentro de la "ventana" (por defecto, hasta la última llegada, con la carga aún entrando)
+    # y la multiprogramación media (procesos en memoria por tick).
+    memoria = MemoriaParticionada(tamano_total, modo, ajuste, particiones, compactacion)
+    planificador = Planificador(politica, quantum)
+    pendientes = deque(sorted(procesos, key=lambda proceso: proceso[0]))
+    if ventana is None:
+        ventana = pendientes[-1][0] if pendientes else 0
+    completados_ventana = 0
+
+    def al_terminar(proceso):
+        nonlocal completados_ventana
+        if planificador.tiempo <= ventana:
+            completados_ventana += 1
+        for _, admitido in memoria.liberar(proceso["PID"], planificador.tiempo):
+            planificador.agregar(admitido)
+
+    planificador.al_terminar = al_terminar
+    pid = 0
+    rechazados = 0
+    residentes = 0  # Suma de procesos en memoria de cada tick
+    while pendientes or planificador.procesos or memoria.cola_espera:
+        while pendientes and pendientes[0][0] <= planificador.tiempo:
+            llegada, rafaga, tamano = pendientes.popleft()
+            pid += 1
+            proceso = {"PID": pid, "Burst Time": rafaga, "Memory": tamano, "Arrival Time": llegada}
+            if tamano > memoria.mayor_bloque:
+                rechazados += 1  # No cabría nunca
+            elif memoria.solicitar(pid, tamano, planificador.tiempo, proceso):
+                planificador.agregar(proceso)
+        if not planificador.procesos and not pendientes:
+            break  # Quedan procesos en espera que ya no pueden entrar
+        # Sin procesos listos se salta directamente a la siguiente llegada
+        ticks = 1 if planificador.procesos else pendientes[0][0] - planificador.tiempo
+        residentes += len(memoria.asignados) * ticks
+        planificador.avanzar(ticks)
+
+    resultado = planificador.metricas()
+    resultado.update(memoria.metricas())
+    resultado["rechazados"] = rechazados
+    resultado["ventana"] = ventana
+    resultado["completados_ventana"] = completados_ventana
+    resultado["multiprogramacion_media"] = residentes / planificador.tiempo if planificador.tiempo else 0.0
+    return resultado
+
+
+def carga_aleatoria(cantidad, tamano_total, semilla=None):
+    aleatorio = random.Random(semilla)
+    llegada = 0
+    procesos = []
+    for _ in range(cantidad):
+        llegada += aleatorio.randint(0, 12)
+        procesos.append((llegada, aleatorio.randint(1, 10), aleatorio.randint(1, max(tamano_total // 4, 1))))
+    return procesos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara estrategias de particionado contiguo con una carga aleatoria")
+    parser.add_argument("--memoria", type=int, default=100, help="Tamaño total de la memoria")
+    parser.add_argument("--procesos", type=int, default=1000, help="Número de procesos de la carga")
+    parser.add_argument("--particiones", type=int, default=4, help="Número de particiones iguales en modo fijo")
+    parser.add_argument("--politica", choices=list(POLITICAS_PLANIFICACION), default="fcfs")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--ventana", type=int, help="Contar los completados hasta este tick (por defecto, la última llegada)")
+    args = parser.parse_args(argv)
+
+    procesos = carga_aleatoria(args.procesos, args.memoria, args.semilla)
+    particiones = [args.memoria // args.particiones] * args.particiones
+    for modo, ajuste, compactacion in [(modo, ajuste, compactacion) for modo in MODOS for ajuste in AJUSTES
+                                       for compactacion in ((False, True) if modo == "variable" else (False,))]:
+        resultado = simular(procesos, args.memoria, modo, ajuste, particiones, compactacion, args.politica,
+                            ventana=args.ventana)
+        nombre = f"{modo}/{ajuste}" + ("+compactación" if compactacion else "")
+        print(f"{nombre:>26}: rendimiento {resultado['rendimiento']:.4f} procesos/tick, "
+              f"completados hasta t={resultado['ventana']} {resultado['completados_ventana']}, "
+              f"multiprogramación {resultado['multiprogramacion_media']:.2f}, "
+              f"retorno medio {resultado['retorno_medio']:.1f}, espera en cola {resultado['espera_media']:.1f}, "
+              f"utilización CPU {resultado['utilizacion_cpu']:.2%}, rechazados {resultado['rechazados']}, "
+              f"compactaciones {resultado['compactaciones']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+from collections import deque
+import heapq
+import threading
+
+import instrumentacion
+
+
+# Colas de listos de cada política. Todas ofrecen agregar(proceso), tomar() -> proceso o None,
+# len() y, para Round-Robin, el quantum tras el cual el proceso en ejecución vuelve a la cola.
+
+
+class ColaFCFS:
+    quantum = None
+
+    def __init__(self):
+        self.procesos = deque()
+
+    def __len__(self):
+        return len(self.procesos)
+
+    def __iter__(self):
+        return iter(self.procesos)
+
+    def agregar(self, proceso):
+        self.procesos.append(proceso)
+
+    def tomar(self):
+        return self.procesos.popleft() if self.procesos else None
+
+
+class ColaRoundRobin(ColaFCFS):
+    def __init__(self, quantum=2):
+        super().__init__()
+        self.quantum = quantum
+
+
+class ColaOrdenada:
+    # Montículo por una clave del proceso; a igual clave se respeta el orden de llegada
+    quantum = None
+
+    def __init__(self, clave):
+        self.clave = clave
+        self.procesos = []
+        self.contador = 0
+
+    def __len__(self):
+        return len(self.procesos)
+
+    def __iter__(self):
+        return (proceso for _, _, proceso in self.procesos)
+
+    def agregar(self, proceso):
+        heapq.heappush(self.procesos, (proceso[self.clave], self.contador, proceso))
+        self.contador += 1
+
+    def tomar(self):
+        return heapq.heappop(self.procesos)[2] if self.procesos else None
+
+
+def crear_cola(politica, quantum=2):
+    if politica == "fcfs":
+        return ColaFCFS()
+    if politica == "sjf":
+        return ColaOrdenada("Burst Time")
+    if politica == "rr":
+        return ColaRoundRobin(quantum)
+    if politica == "prioridad":
+        return ColaOrdenada("Priority")  # Menor número = mayor prioridad
+    raise ValueError(f"Política de planificación desconocida: {politica}")
+
+
+POLITICAS_PLANIFICACION = {
+    "fcfs": "FCFS",
+    "sjf": "SJF",
+    "rr": "Round-Robin",
+    "prioridad": "Prioridad",
+}
+
+
+class Planificador:
+    # Planificación de una CPU con reloj virtual: cada tick ejecuta una unidad de tiempo
+    # del proceso en CPU. El reloj solo avanza con avanzar(); quien quiera tiempo real
+    # (como el panel) convierte el tiempo transcurrido en ticks con segundos_por_tick.
+    # El lock protege el estado si varios hilos comparten el mismo planificador.
+    def __init__(self, politica="fcfs", quantum=2, segundos_por_tick=1.0, al_terminar=None, conservar_completados=True):
+        self.lock = threading.RLock()
+        self.politica = politica
+        self.quantum = quantum
+        self.listos = crear_cola(politica, quantum)
+        self.segundos_por_tick = segundos_por_tick
+        self.al_terminar = al_terminar  # Se llama con el proceso terminado, dentro del lock
+        self.procesos = {}  # PID -> proceso activo (listo o en CPU)
+        self.completados = {}  # PID -> proceso terminado
+        self.conservar_completados = conservar_completados  # False para cargas muy largas
+        self.num_completados = 0
+        self.en_cpu = None
+        self.ticks_en_cpu = 0  # Ticks seguidos del proceso en CPU, para el quantum
+        self.tiempo = 0
+        self.ticks_ocupados = 0
+        self.espera_acumulada = 0
+        self.retorno_acumulado = 0
+        self.version = 0  # Aumenta con cada cambio visible de los procesos
+        self.version_procesos = 0  # Aumenta cuando entra o sale un proceso
+
+    def agregar(self, proceso):
+        with self.lock:
+            proceso.setdefault("Remaining Time", proceso["Burst Time"])
+            proceso.setdefault("Elapsed Time", 0)
+            proceso.setdefault("Priority", 0)
+            # La llegada es la entrada al sistema: si el proceso esperó antes en la cola de la
+            # memoria, quien lo creó ya la fijó y esa espera cuenta en el retorno
+            proceso.setdefault("Arrival Time", self.tiempo)
+            self.procesos[proceso["PID"]] = proceso
+            self.listos.agregar(proceso)
+            self.version += 1
+            self.version_procesos += 1
+
+    def __getstate__(self):
+        # Para guardar el planificador (p. ej. en una sesión): sin el lock
+        estado = self.__dict__.copy()
+        del estado["lock"]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self.lock = threading.RLock()
+
+    def cambiar_politica(self, politica, quantum=None):
+        with self.lock:
+            if quantum is not None:
+                self.quantum = quantum
+            listos = list(self.listos)
+            listos.sort(key=lambda proceso: proceso["Arrival Time"])
+            self.politica = politica
+            self.listos = crear_cola(politica, self.quantum)
+            for proceso in listos:
+                self.listos.agregar(proceso)
+
+    @instrumentacion.medir("planificador_avanzar", "Duración de Planificador.avanzar")
+    def avanzar(self, ticks=1):
+        # Devuelve los procesos que terminaron durante estos ticks
+        terminados = []
+        with self.lock:
+            ocupados = self.ticks_ocupados
+            for tick in range(ticks):
+                if self.en_cpu is None:
+                    self.en_cpu = self.listos.tomar()
+                    self.ticks_en_cpu = 0
+                proceso = self.en_cpu
+                if proceso is None:
+                    self.tiempo += ticks - tick  # CPU ociosa hasta el final: no hace falta iterar
+                    break
+                self.tiempo += 1
+
+                proceso["Remaining Time"] -= 1
+                proceso["Elapsed Time"] += 1
+                self.version += 1
+                self.ticks_ocupados += 1
+                self.ticks_en_cpu += 1
+                if proceso["Remaining Time"] <= 0:
+                    self.terminar(proceso)
+                    terminados.append(proceso)
+                    self.en_cpu = None
+                elif self.listos.quantum is not None and self.ticks_en_cpu >= self.listos.quantum:
+                    self.listos.agregar(proceso)
+                    self.en_cpu = None
+            instrumentacion.contar("planificador_ticks", ticks)
+            instrumentacion.contar("planificador_ticks_ocupados", self.ticks_ocupados - ocupados)
+        return terminados
+
+    def terminar(self, proceso):
+        proceso["Finish Time"] = self.tiempo
+        proceso["Turnaround Time"] = self.tiempo - proceso["Arrival Time"]
+        proceso["Waiting Time"] = proceso["Turnaround Time"] - proceso["Burst Time"]
+        self.espera_acumulada += proceso["Waiting Time"]
+        self.retorno_acumulado += proceso["Turnaround Time"]
+        del self.procesos[proceso["PID"]]
+        if self.conservar_completados:
+            self.completados[proceso["PID"]] = proceso
+        self.num_completados += 1
+        self.version_procesos += 1
+        if self.al_terminar is not None:
+            self.al_terminar(proceso)
+
+    def ejecutar(self, llegadas):
+        # Consume (instante de llegada, proceso) en orden de llegada, sin materializar la
+        # carga, y sigue avanzando hasta que terminan todos los procesos
+        for llegada, proceso in llegadas:
+            if llegada > self.tiempo:
+                self.avanzar(llegada - self.tiempo)
+            self.agregar(proceso)
+        while self.procesos:
+            self.avanzar(sum(proceso["Remaining Time"] for proceso in self.procesos.values()))
+        return self.metricas()
+
+    def activos(self):
+        with self.lock:
+            return list(self.procesos.values())
+
+    def limpiar(self):
+        with self.lock:
+            self.procesos.clear()
+            self.completados.clear()
+            self.num_completados = 0
+            self.listos = crear_cola(self.politica, self.quantum)
+            self.en_cpu = None
+            self.tiempo = 0
+            self.ticks_ocupados = 0
+            self.espera_acumulada = 0
+            self.retorno_acumulado = 0
+            self.version += 1
+            self.version_procesos += 1
+
+    def metricas(self):
+        with self.lock:
+            cantidad = self.num_completados
+            return {
+                "tiempo": self.tiempo,
+                "completados": cantidad,
+                "espera_media": self.espera_acumulada / cantidad if cantidad else 0.0,
+                "retorno_medio": self.retorno_acumulado / cantidad if cantidad else 0.0,
+                "utilizacion_cpu": self.ticks_ocupados / self.tiempo if self.tiempo else 0.0,
+                "rendimiento": cantidad / self.tiempo if self.tiempo else 0.0,
+            }
@@ -0,0 +1,342 @@
+from bisect import bisect_left, insort
+import heapq
+
+
+# Políticas de ubicación: deciden qué marcos libres recibe cada proceso.
+# Todas ofrecen la misma interfaz:
+#   len(politica)            -> páginas libres
+#   politica.tomar(cantidad) -> lista de marcos (puede ser mayor que cantidad) o None si no cabe;
+#                               con cantidad <= 0 no entrega nada ([])
+#   politica.devolver(marcos)
+#   Politica.desde_libres(mapa, tabla_paginas, compacta, cursor) -> política en el estado que
+#       corresponde a un mapa con un byte por página (1 = libre); ver puntos_control.py
+
+
+def agrupar_tramos(paginas):
+    # Tramos (inicio, longitud) de páginas consecutivas, en el orden en que aparecen
+    tramos = []
+    inicio = anterior = None
+    for num_pagina in paginas:
+        if anterior is not None and num_pagina == anterior + 1:
+            anterior = num_pagina
+            continue
+        if inicio is not None:
+            tramos.append((inicio, anterior - inicio + 1))
+        inicio = anterior = num_pagina
+    if inicio is not None:
+        tramos.append((inicio, anterior - inicio + 1))
+    return tramos
+
+
+def tramos_libres(mapa):
+    # Tramos (inicio, longitud) de las páginas libres de un mapa con un byte por página
+    tramos = []
+    inicio = mapa.find(1)
+    while inicio >= 0:
+        fin = mapa.find(0, inicio)
+        if fin < 0:
+            fin = len(mapa)
+        tramos.append((inicio, fin - inicio))
+        inicio = mapa.find(1, fin)
+    return tramos
+
+
+class MonticuloLibres:
+    # Montículo con las páginas libres: siempre entrega la de menor número
+    def __init__(self, num_paginas):
+        self.paginas = list(range(num_paginas))
+
+    def __len__(self):
+        return len(self.paginas)
+
+    def tomar(self):
+        return heapq.heappop(self.paginas)
+
+    def devolver(self, num_pagina):
+        heapq.heappush(self.paginas, num_pagina)
+
+
+class MapaBitsLibres:
+    # Un byte por página (1 = libre). Ocupa mucho menos que el montículo y
+    # sigue entregando la página libre de menor número.
+    def __init__(self, num_paginas):
+        self.mapa = bytearray(b'\x01') * num_paginas
+        self.libres = num_paginas
+        self.cursor = 0  # No hay páginas libres por debajo del cursor
+
+    def __len__(self):
+        return self.libres
+
+    def tomar(self):
+        num_pagina = self.mapa.find(1, self.cursor)
+        self.mapa[num_pagina] = 0
+        self.libres -= 1
+        self.cursor = num_pagina + 1
+        return num_pagina
+
+    def devolver(self, num_pagina):
+        self.mapa[num_pagina] = 1
+        self.libres += 1
+        if num_pagina < self.cursor:
+            self.cursor = num_pagina
+
+
+class PrimerAjuste:
+    # Entrega las páginas libres de menor número (el comportamiento original)
+    def __init__(self, num_paginas, compacta=False):
+        self.libres = MapaBitsLibres(num_paginas) if compacta else MonticuloLibres(num_paginas)
+
+    @classmethod
+    def desde_libres(cls, mapa, tabla_paginas, compacta=False, cursor=0):
+        # Da igual en qué orden se liberaron: siempre se entrega la libre de menor número
+        politica = cls(0, compacta)
+        libres = politica.libres
+        if compacta:
+            libres.mapa = mapa
+            libres.libres = mapa.count(1)
+            libres.cursor = max(mapa.find(1), 0)
+        else:
+            for inicio, longitud in tramos_libres(mapa):
+                libres.paginas.extend(range(inicio, inicio + longitud))  # Ordenada: ya es un montículo
+        return politica
+
+    def __len__(self):
+        return len(self.libres)
+
+    def tomar(self, cantidad):
+        if cantidad > len(self.libres):
+            return None
+        tomar = self.libres.tomar
+        return [tomar() for _ in range(cantidad)]
+
+    def devolver(self, paginas):
+        devolver = self.libres.devolver
+        for num_pagina in paginas:
+            devolver(num_pagina)
+
+
+class SiguienteAjuste:
+    # Sigue buscando desde donde terminó la asignación anterior y da la vuelta al final
+    def __init__(self, num_paginas, compacta=False):
+        self.mapa = bytearray(b'\x01') * num_paginas
+        self.libres = num_paginas
+        self.cursor = 0
+
+    @classmethod
+    def desde_libres(cls, mapa, tabla_paginas, compacta=False, cursor=0):
+        # El cursor es lo único que no se deduce del mapa
+        politica = cls(0, compacta)
+        politica.mapa = mapa
+        politica.libres = mapa.count(1)
+        politica.cursor = cursor
+        return politica
+
+    def __len__(self):
+        return self.libres
+
+    def tomar(self, cantidad):
+        if cantidad <= 0:
+            return []
+        if cantidad > self.libres:
+            return None
+        mapa = self.mapa
+        cursor = self.cursor
+        paginas = []
+        for _ in range(cantidad):
+            num_pagina = mapa.find(1, cursor)
+            if num_pagina < 0:
+                num_pagina = mapa.find(1)
+            mapa[num_pagina] = 0
+            paginas.append(num_pagina)
+            cursor = num_pagina + 1
+        self.cursor = cursor
+        self.libres -= cantidad
+        return paginas
+
+    def devolver(self, paginas):
+        for num_pagina in paginas:
+            self.mapa[num_pagina] = 1
+        self.libres += len(paginas)
+
+
+class MejorAjusteContiguo:
+    # Tramos libres ordenados por longitud: el proceso ocupa el tramo más pequeño en el
+    # que cabe entero. Si ninguno alcanza, se reparte empezando por los tramos más largos.
+    def __init__(self, num_paginas, compacta=False):
+        self.tramos = {}  # inicio -> longitud
+        self.finales = {}  # fin (exclusivo) -> inicio
+        self.por_longitud = []  # (longitud, inicio), ordenada
+        self.libres = 0
+        if num_paginas:
+            self.agregar_tramo(0, num_paginas)
+
+    @classmethod
+    def desde_libres(cls, mapa, tabla_paginas, compacta=False, cursor=0):
+        # Los tramos libres siempre son máximos: al devolver páginas se fusionan con sus vecinos
+        politica = cls(0, compacta)
+        tramos = tramos_libres(mapa)
+        politica.tramos = dict(tramos)
+        politica.finales = {inicio + longitud: inicio for inicio, longitud in tramos}
+        politica.por_longitud = sorted((longitud, inicio) for inicio, longitud in tramos)
+        politica.libres = sum(longitud for _, longitud in tramos)
+        return politica
+
+    def __len__(self):
+        return self.libres
+
+    def agregar_tramo(self, inicio, longitud):
+        self.tramos[inicio] = longitud
+        self.finales[inicio + longitud] = inicio
+        insort(self.por_longitud, (longitud, inicio))
+        self.libres += longitud
+
+    def quitar_tramo(self, inicio):
+        longitud = self.tramos.pop(inicio)
+        del self.finales[inicio + longitud]
+        del self.por_longitud[bisect_left(self.por_longitud, (longitud, inicio))]
+        self.libres -= longitud
+        return longitud
+
+    def tomar(self, cantidad):
+        if cantidad > self.libres:
+            return None
+        paginas = []
+        indice = bisect_left(self.por_longitud, (cantidad, -1))
+        while len(paginas) < cantidad:
+            # El tramo justo si existe; si no, el más largo que quede
+            longitud, inicio = self.por_longitud[indice] if indice < len(self.por_longitud) else self.por_longitud[-1]
+            usadas = min(longitud, cantidad - len(paginas))
+            self.quitar_tramo(inicio)
+            if longitud > usadas:
+                self.agregar_tramo(inicio + usadas, longitud - usadas)
+            paginas.extend(range(inicio, inicio + usadas))
+        return paginas
+
+    def devolver(self, paginas):
+        for inicio, longitud in agrupar_tramos(sorted(paginas)):
+            fin = inicio + longitud
+            anterior = self.finales.get(inicio)
+            if anterior is not None:
+                self.quitar_tramo(anterior)
+                inicio = anterior
+            if fin in self.tramos:
+                fin += self.quitar_tramo(fin)
+            self.agregar_tramo(inicio, fin - inicio)
+
+
+class SistemaCompaneros:
+    # Bloques contiguos de 2^k páginas que se dividen al asignar y se fusionan con su
+    # compañero al liberar. Cada proceso recibe un bloque de la potencia de dos siguiente.
+    # De cada orden se entrega el bloque libre de menor dirección: un montículo por orden
+    # (con borrado perezoso) lo encuentra, y el conjunto dice qué bloques siguen libres.
+    # Así las elecciones no dependen del orden interno de los conjuntos y una copia
+    # (p. ej. restaurada de un punto de control) reparte los mismos bloques que el original.
+    def __init__(self, num_paginas, compacta=False):
+        self.bloques_libres = [set() for _ in range(max(num_paginas.bit_length(), 1))]
+        self.montones = [[] for _ in self.bloques_libres]
+        self.asignados = {}  # inicio del bloque -> orden
+        self.libres = num_paginas
+        # Si la memoria no es potencia de dos, se parte en bloques alineados
+        inicio = 0
+        while inicio < num_paginas:
+            orden = (num_paginas - inicio).bit_length() - 1
+            while inicio % (1 << orden):
+                orden -= 1
+            self.agregar_bloque(orden, inicio)
+            inicio += 1 << orden
+
+    @classmethod
+    def desde_libres(cls, mapa, tabla_paginas, compacta=False, cursor=0):
+        # Los bloques libres son los que deja partir la memoria vacía hasta aislar cada bloque
+        # asignado: como al liberar se fusiona todo lo posible, no dependen del orden de las
+        # operaciones. Cada tabla de lista es un bloque; en las de diccionario, cada marco.
+        politica = cls(len(mapa), compacta)
+        for tabla in tabla_paginas.values():
+            if isinstance(tabla, dict):
+                for marco in tabla:
+                    politica.aislar_bloque(marco, 0)
+            elif len(tabla):
+                politica.aislar_bloque(tabla[0], len(tabla).bit_length() - 1)
+        politica.montones = [sorted(libres) for libres in politica.bloques_libres]
+        return politica
+
+    def aislar_bloque(self, inicio, orden):
+        # Marca como asignado el bloque, partiendo el bloque libre que lo contiene (sin montículos)
+        superior = orden
+        while superior < len(self.bloques_libres) and inicio >> superior << superior not in self.bloques_libres[superior]:
+            superior += 1
+        if superior == len(self.bloques_libres):
+            raise ValueError(f"El bloque de {1 << orden} páginas en {inicio} no está libre.")
+        bloque = inicio >> superior << superior
+        self.bloques_libres[superior].remove(bloque)
+        while superior > orden:
+            superior -= 1
+            mitad = bloque + (1 << superior)
+            if inicio >= mitad:
+                self.bloques_libres[superior].add(bloque)
+                bloque = mitad
+            else:
+                self.bloques_libres[superior].add(mitad)
+        self.asignados[inicio] = orden
+        self.libres -= 1 << orden
+
+    def __len__(self):
+        return self.libres
+
+    def agregar_bloque(self, orden, inicio):
+        self.bloques_libres[orden].add(inicio)
+        heapq.heappush(self.montones[orden], inicio)
+
+    def tomar_bloque(self, orden):
+        # Bloque libre de menor dirección del orden; descarta las entradas ya no libres
+        libres = self.bloques_libres[orden]
+        monton = self.montones[orden]
+        while True:
+            inicio = heapq.heappop(monton)
+            if inicio in libres:
+                libres.remove(inicio)
+                return inicio
+
+    def tomar(self, cantidad):
+        if cantidad <= 0:
+            return []
+        orden = (cantidad - 1).bit_length()
+        for disponible in range(orden, len(self.bloques_libres)):
+            if self.bloques_libres[disponible]:
+                break
+        else:
+            return None
+
+        inicio = self.tomar_bloque(disponible)
+        while disponible > orden:
+            disponible -= 1
+            self.agregar_bloque(disponible, inicio + (1 << disponible))
+        self.asignados[inicio] = orden
+        self.libres -= 1 << orden
+        return list(range(inicio, inicio + (1 << orden)))
+
+    def devolver(self, paginas):
+        # Solo las páginas que inician un bloque asignado liberan el bloque entero
+        for inicio in paginas:
+            orden = self.asignados.pop(inicio, None)
+            if orden is None:
+                continue
+            self.libres += 1 << orden
+            while orden + 1 < len(self.bloques_libres):
+                companero = inicio ^ (1 << orden)
+                if companero not in self.bloques_libres[orden]:
+                    break
+                self.bloques_libres[orden].remove(companero)  # Su entrada del montículo queda obsoleta
+                if len(self.montones[orden]) > 2 * len(self.bloques_libres[orden]) + 64:
+                    self.montones[orden] = sorted(self.bloques_libres[orden])
+                inicio = min(inicio, companero)
+                orden += 1
+            self.agregar_bloque(orden, inicio)
+
+
+POLITICAS = {
+    "primer_ajuste": PrimerAjuste,
+    "siguiente_ajuste": SiguienteAjuste,
+    "mejor_ajuste": MejorAjusteContiguo,
+    "companeros": SistemaCompaneros,
+}
@@ -0,0 +1,374 @@
+from array import array
+from contextlib import contextmanager
+import gc
+import json
+import mmap
+import os
+import struct
+import sys
+import uuid
+
+from memoria import MARCO_LIBRE, MarcosCompactos, Memoria, Proceso
+from politicas import POLITICAS, tramos_libres
+
+
+# Puntos de control de una Memoria en un archivo binario con versión. Tras la cabecera van
+# las secciones, cada una alineada a 8 bytes:
+#   marcos    completo: propietario de cada marco (int32, -1 = libre)
+#             incremental: índices de los marcos que cambiaron y su nuevo propietario (int32)
+#   tablas    (ID, tipo, inicio, longitud, fragmentación interna o -1) por tabla de páginas
+#             (int64): todas en un punto completo; en uno incremental, solo las que cambiaron
+#             y las que desaparecieron (con longitud -1)
+#   paginas   marcos de las tablas de tipo lista; pares (marco, página) en las de diccionario
+#   procesos  (ID, tamaño, llegada, vida o -1) de los procesos activos (int64); en uno
+#             incremental, solo los nuevos y los que ya no están (con tamaño -1)
+#   metricas  JSON con las métricas de asignación y los datos extra
+#   base      ruta del punto anterior, relativa a este archivo (solo incremental)
+# La política de ubicación no se guarda: se reconstruye a partir de los marcos libres y las
+# tablas (ver desde_libres en politicas.py); solo hace falta el cursor del siguiente ajuste.
+# Los enteros van en el orden de bytes de la máquina que escribió el archivo; al restaurar
+# se proyecta con mmap y cada sección se copia de una vez, sin interpretar los valores.
+
+MAGIA = b"MEMPCTL\x00"
+VERSION_FORMATO = 2
+COMPLETO = 0
+INCREMENTAL = 1
+TABLA_LISTA = 0
+TABLA_DICCIONARIO = 1
+BORRADO = -1
+
+# magia, versión, tipo, little endian, compacta, serie, secuencia, secuencia de la base,
+# tamaño total, tamaño de página, páginas, tiempo actual, política, cursor de la política,
+# marcos, tablas, páginas de las tablas, procesos, bytes de las métricas, bytes de la ruta de la base
+CABECERA = struct.Struct("<8sIIII16sqqqqqq24sqqqqqqq")
+
+# Atributos de MetricasAsignacion que van en el JSON (por_proceso va con las tablas)
+CAMPOS_METRICAS = ("asignaciones", "rechazos", "fragmentacion_interna", "fragmentacion_interna_acumulada",
+                   "tramos_acumulados", "latencia_acumulada", "ultima")
+
+# Byte más alto de un propietario int32 -> 1 si el marco está libre (-1 es el único con 0xff)
+ALTO_A_LIBRE = bytes(255) + b"\x01"
+
+
+@contextmanager
+def sin_recolector():
+    # Restaurar crea cientos de miles de objetos sin ciclos (tablas, procesos, tuplas) y el
+    # recolector de ciclos recorrería una y otra vez la memoria ya creada: se pausa mientras tanto
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
+
+
+def relleno(tamano):
+    return -tamano % 8
+
+
+def comprobar_id(proceso_id):
+    if not isinstance(proceso_id, int) or not 0 <= proceso_id < 2 ** 31:
+        raise ValueError("Los puntos de control solo admiten IDs de proceso enteros entre 0 y 2^31 - 1.")
+
+
+def propietarios(memoria_fisica, marcos=None):
+    # Propietario de los marcos indicados (o de todos) como array int32, con -1 en los libres
+    if isinstance(memoria_fisica, MarcosCompactos):
+        if marcos is None:
+            return memoria_fisica.marcos
+        datos = memoria_fisica.marcos
+        return array('i', (datos[i] for i in marcos))
+    valores = memoria_fisica if marcos is None else (memoria_fisica[i] for i in marcos)
+    return array('i', (MARCO_LIBRE if proceso_id is None else proceso_id for proceso_id in valores))
+
+
+def mapa_libres(marcos):
+    # Un byte por marco de un array int32 de propietarios, 1 si está libre
+    alto = 3 if sys.byteorder == "little" else 0
+    return bytearray(marcos.tobytes()[alto::4].translate(ALTO_A_LIBRE))
+
+
+def serializar_tablas(tabla_paginas, escribir, borradas=(), fragmentacion=None):
+    # Registros y páginas de las tablas de "escribir", más uno por cada ID de "borradas"
+    fragmentacion = fragmentacion or {}
+    registros = array('q')
+    paginas = array('i')
+    for proceso_id in escribir:
+        comprobar_id(proceso_id)
+        tabla = tabla_paginas[proceso_id]
+        tipo = TABLA_DICCIONARIO if isinstance(tabla, dict) else TABLA_LISTA
+        registros.extend((proceso_id, tipo, len(paginas), len(tabla), fragmentacion.get(proceso_id, -1)))
+        if tipo == TABLA_DICCIONARIO:
+            for marco, pagina in tabla.items():
+                paginas.append(marco)
+                paginas.append(pagina)
+        else:
+            paginas.extend(tabla)
+    for proceso_id in borradas:
+        registros.extend((proceso_id, TABLA_LISTA, 0, BORRADO, -1))
+    return registros, paginas
+
+
+def serializar_procesos(procesos, borrados=()):
+    registros = array('q')
+    for proceso in procesos:
+        comprobar_id(proceso.id_proceso)
+        registros.extend((proceso.id_proceso, proceso.tamano, proceso.tiempo_llegada,
+                          -1 if proceso.tiempo_vida is None else proceso.tiempo_vida))
+    for proceso_id in borrados:
+        registros.extend((proceso_id, BORRADO, 0, -1))
+    return registros
+
+
+def serializar_metricas(metricas, extra):
+    datos = {campo: getattr(metricas, campo) for campo in CAMPOS_METRICAS}
+    datos["histograma_latencias"] = list(metricas.histograma_latencias.items())
+    datos["extra"] = extra
+    return json.dumps(datos, separators=(",", ":")).encode("utf-8")
+
+
+class PuntosControl:
+    # Serie de puntos de control de una Memoria. El primero es completo y los siguientes
+    # incrementales: solo guardan los marcos, las tablas de páginas y los procesos que
+    # cambiaron desde el anterior, así que para restaurarlos hacen falta los anteriores.
+    # Tras reiniciar la memoria, o tras max_incrementales seguidos, el siguiente vuelve a ser
+    # completo: así restaurar no tiene que leer una serie cada vez más larga.
+    def __init__(self, memoria, max_incrementales=64):
+        self.memoria = memoria
+        self.max_incrementales = max_incrementales
+        self.incrementales = 0  # Seguidos desde el último completo
+        self.cambios = memoria.nuevo_rastreador()
+        self.serie = uuid.uuid4().bytes
+        self.secuencia = -1
+        self.ultima_ruta = None
+        self.tablas = set()  # IDs con tabla de páginas en el último punto guardado
+        self.procesos = {}  # ID -> Proceso del último punto guardado
+
+    def guardar(self, ruta, procesos=(), extra=None, completo=False):
+        # Devuelve True si el punto guardado es incremental. "extra" tiene que poder pasarse a JSON.
+        memoria = self.memoria
+        tabla_paginas = memoria.tabla_paginas
+        incremental = (not completo and self.ultima_ruta is not None and not self.cambios.completo
+                       and self.incrementales < self.max_incrementales)
+        con_tabla = set(tabla_paginas)
+        actuales = {proceso.id_proceso: proceso for proceso in procesos}
+        if incremental:
+            marcos = array('i', sorted(self.cambios.marcos))
+            # Se reescribe la tabla de quien ocupa ahora un marco que cambió y la de los procesos
+            # nuevos; la de quien lo perdió sin quedarse sin tabla se corrige al restaurar
+            escribir = {memoria.memoria_fisica[i] for i in marcos} & con_tabla | con_tabla - self.tablas
+            borradas = self.tablas - con_tabla
+            nuevos = [proceso for proceso_id, proceso in actuales.items() if self.procesos.get(proceso_id) is not proceso]
+            borrados = self.procesos.keys() - actuales.keys()
+            ruta_base = os.path.relpath(os.path.abspath(self.ultima_ruta), os.path.dirname(os.path.abspath(ruta)))
+        else:
+            escribir = tabla_paginas
+            borradas = borrados = ()
+            nuevos = actuales.values()
+            ruta_base = ""
+        # Las tablas van primero porque comprueban los IDs antes de convertirlos a int32
+        registros_tablas, paginas = serializar_tablas(tabla_paginas, escribir, borradas, memoria.metricas.por_proceso)
+        if incremental:
+            secciones_marcos = [marcos, propietarios(memoria.memoria_fisica, marcos)]
+        else:
+            secciones_marcos = [propietarios(memoria.memoria_fisica)]
+        registros_procesos = serializar_procesos(nuevos, borrados)
+        metricas = serializar_metricas(memoria.metricas, extra)
+        ruta_base = ruta_base.encode("utf-8")
+
+        cabecera = CABECERA.pack(
+            MAGIA, VERSION_FORMATO, INCREMENTAL if incremental else COMPLETO, sys.byteorder == "little",
+            memoria.compacta, self.serie, self.secuencia + 1, self.secuencia if incremental else -1,
+            memoria.tamano_total, memoria.tamano_pagina, memoria.num_paginas, memoria.tiempo_actual,
+            memoria.politica.encode("ascii"), getattr(memoria.paginas_libres, "cursor", 0),
+            len(secciones_marcos[0]), len(registros_tablas) // 5, len(paginas), len(registros_procesos) // 4,
+            len(metricas), len(ruta_base))
+        # Se escribe en un temporal y se renombra: nunca queda un punto de control a medias
+        temporal = ruta + ".tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(cabecera)
+            for seccion in (b"".join(datos.tobytes() for datos in secciones_marcos),
+                            registros_tablas.tobytes(), paginas.tobytes(), registros_procesos.tobytes(), metricas, ruta_base):
+                archivo.write(seccion)
+                archivo.write(bytes(relleno(len(seccion))))
+        os.replace(temporal, ruta)
+
+        self.secuencia += 1
+        self.ultima_ruta = ruta
+        self.incrementales = self.incrementales + 1 if incremental else 0
+        self.tablas = con_tabla
+        self.procesos = actuales
+        self.cambios.consumir()
+        return incremental
+
+
+def leer_seccion(vista, desplazamiento, cantidad, tipo, invertir):
+    # Copia la sección de la proyección a un array (una sola copia de memoria)
+    datos = array(tipo)
+    datos.frombytes(vista[desplazamiento:desplazamiento + cantidad * datos.itemsize])
+    if invertir:
+        datos.byteswap()
+    return datos
+
+
+def leer(ruta):
+    # Cabecera y secciones de un punto de control, sin aplicar
+    with open(ruta, "rb") as archivo:
+        try:
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"{ruta} está vacío.")
+    with mapa, memoryview(mapa) as vista:
+        if len(vista) < CABECERA.size or vista[:len(MAGIA)] != MAGIA:
+            raise ValueError(f"{ruta} no es un punto de control de la memoria.")
+        (_, version, tipo, little, compacta, serie, secuencia, base_secuencia, tamano_total, tamano_pagina,
+         num_paginas, tiempo_actual, politica, cursor, num_marcos, num_tablas, len_paginas, num_procesos,
+         len_metricas, len_base) = CABECERA.unpack_from(vista)
+        if version != VERSION_FORMATO:
+            raise ValueError(f"Versión de punto de control no soportada: {version}")
+        invertir = bool(little) != (sys.byteorder == "little")
+
+        punto = {
+            "tipo": tipo, "compacta": bool(compacta), "serie": serie, "secuencia": secuencia,
+            "base_secuencia": base_secuencia, "tamano_total": tamano_total, "tamano_pagina": tamano_pagina,
+            "num_paginas": num_paginas, "tiempo_actual": tiempo_actual,
+            "politica": politica.rstrip(b"\x00").decode("ascii"), "cursor": cursor,
+        }
+        desplazamiento = CABECERA.size
+        if tipo == INCREMENTAL:
+            punto["indices"] = leer_seccion(vista, desplazamiento, num_marcos, 'i', invertir)
+            desplazamiento += num_marcos * 4
+        punto["marcos"] = leer_seccion(vista, desplazamiento, num_marcos, 'i', invertir)
+        desplazamiento += num_marcos * 4
+        desplazamiento += relleno(desplazamiento)
+        punto["tablas"] = leer_seccion(vista, desplazamiento, num_tablas * 5, 'q', invertir)
+        desplazamiento += num_tablas * 40
+        punto["paginas"] = leer_seccion(vista, desplazamiento, len_paginas, 'i', invertir)
+        desplazamiento += len_paginas * 4
+        desplazamiento += relleno(desplazamiento)
+        punto["procesos"] = leer_seccion(vista, desplazamiento, num_procesos * 4, 'q', invertir)
+        desplazamiento += num_procesos * 32
+        if desplazamiento + len_metricas + len_base > len(vista):
+            raise ValueError(f"{ruta} está truncado.")
+        punto["metricas"] = json.loads(bytes(vista[desplazamiento:desplazamiento + len_metricas]))
+        desplazamiento += len_metricas + relleno(len_metricas)
+        punto["base"] = bytes(vista[desplazamiento:desplazamiento + len_base]).decode("utf-8")
+    return punto
+
+
+def construir_tablas(punto, compacta):
+    # (IDs, tablas o None si se borraron, fragmentación interna o -1), en el orden del archivo
+    tablas = punto["tablas"]
+    paginas = punto["paginas"] if compacta else punto["paginas"].tolist()
+    ids = tablas[0::5]
+    contenido = [None if longitud == BORRADO else
+                 dict(zip(paginas[inicio:inicio + 2 * longitud:2], paginas[inicio + 1:inicio + 2 * longitud:2]))
+                 if tipo == TABLA_DICCIONARIO else paginas[inicio:inicio + longitud]
+                 for tipo, inicio, longitud in zip(tablas[1::5], tablas[2::5], tablas[3::5])]
+    return ids, contenido, tablas[4::5]
+
+
+def leer_serie(ruta):
+    # Puntos de la serie que termina en "ruta", del completo al último. Cada archivo se lee
+    # una sola vez y sin recursión: una serie puede tener cualquier número de incrementales.
+    serie = [leer(ruta)]
+    while serie[-1]["tipo"] == INCREMENTAL:
+        punto = serie[-1]
+        ruta_base = os.path.join(os.path.dirname(os.path.abspath(ruta)), punto["base"])
+        base = leer(ruta_base)
+        if base["serie"] != punto["serie"] or base["secuencia"] != punto["base_secuencia"]:
+            raise ValueError(f"{ruta_base} no es el punto de control anterior a {ruta}.")
+        serie.append(base)
+        ruta = ruta_base
+    serie.reverse()
+    return serie
+
+
+def aplicar(serie, max_historial, archivo_historial):
+    # Memoria con los marcos y las tablas de la serie, sin la política de ubicación.
+    # Devuelve (memoria, {ID: (tamaño, llegada, vida o -1)}, mapa de marcos libres).
+    completo = serie[0]
+    compacta = completo["compacta"]
+    marcos = completo["marcos"]
+    ids, contenido, fragmentaciones = construir_tablas(completo, compacta)
+    tabla_paginas = dict(zip(ids, contenido))
+    por_proceso = {proceso_id: fragmentacion for proceso_id, fragmentacion in zip(ids, fragmentaciones)
+                   if fragmentacion != -1}
+    registros = completo["procesos"]
+    procesos = dict(zip(registros[0::4], zip(registros[1::4], registros[2::4], registros[3::4])))
+
+    for punto in serie[1:]:
+        ids, contenido, fragmentaciones = construir_tablas(punto, compacta)
+        escritas = set(ids)
+        for marco, proceso_id in zip(punto["indices"], punto["marcos"]):
+            # Las tablas por marco (paginación bajo demanda) pueden perder marcos sin reescribirse
+            anterior = marcos[marco]
+            if anterior != MARCO_LIBRE and anterior not in escritas:
+                tabla = tabla_paginas.get(anterior)
+                if isinstance(tabla, dict):
+                    tabla.pop(marco, None)
+            marcos[marco] = proceso_id
+        for proceso_id, tabla, fragmentacion in zip(ids, contenido, fragmentaciones):
+            # Una tabla reescrita pasa al final, como si se hubiera vuelto a asignar
+            tabla_paginas.pop(proceso_id, None)
+            por_proceso.pop(proceso_id, None)
+            if tabla is not None:
+                tabla_paginas[proceso_id] = tabla
+                if fragmentacion != -1:
+                    por_proceso[proceso_id] = fragmentacion
+        registros = punto["procesos"]
+        for proceso_id, tamano, llegada, vida in zip(registros[0::4], registros[1::4], registros[2::4], registros[3::4]):
+            procesos.pop(proceso_id, None)
+            if tamano != BORRADO:
+                procesos[proceso_id] = (tamano, llegada, vida)
+
+    # Se crea vacía para no reservar unas estructuras que se van a sustituir
+    ultimo = serie[-1]
+    memoria = Memoria(0, ultimo["tamano_pagina"], compacta, max_historial, archivo_historial, ultimo["politica"])
+    memoria.tamano_total = ultimo["tamano_total"]
+    memoria.num_paginas = ultimo["num_paginas"]
+    mapa = mapa_libres(marcos)
+    if compacta:
+        memoria.memoria_fisica = MarcosCompactos(0)
+        memoria.memoria_fisica.marcos = marcos
+    else:
+        # Los huecos se rellenan por tramos: no se recorre la memoria marco a marco
+        memoria.memoria_fisica = marcos.tolist()
+        for inicio, longitud in tramos_libres(mapa):
+            memoria.memoria_fisica[inicio:inicio + longitud] = [None] * longitud
+    memoria.tabla_paginas = tabla_paginas
+    memoria.metricas.por_proceso = por_proceso
+    return memoria, procesos, mapa
+
+
+def restaurar_memoria(ruta, max_historial=None, archivo_historial=None):
+    # Devuelve (memoria, {ID: (tamaño, llegada, vida o -1)}, extra, último punto leído).
+    # Un punto incremental se aplica sobre los anteriores de su serie.
+    serie = leer_serie(ruta)
+    punto = serie[-1]
+    with sin_recolector():
+        memoria, procesos, mapa = aplicar(serie, max_historial, archivo_historial)
+    memoria.tiempo_actual = punto["tiempo_actual"]
+    memoria.paginas_libres = POLITICAS[memoria.politica].desde_libres(
+        mapa, memoria.tabla_paginas, memoria.compacta, punto["cursor"])
+    metricas = punto["metricas"]
+    for campo in CAMPOS_METRICAS:
+        setattr(memoria.metricas, campo, metricas[campo])
+    memoria.metricas.histograma_latencias = dict(metricas["histograma_latencias"])
+    for rastreador in memoria.rastreadores:
+        rastreador.completo = True
+    return memoria, procesos, metricas["extra"], punto
+
+
+def restaurar(ruta, max_historial=None, archivo_historial=None):
+    # Devuelve (memoria, procesos activos, extra)
+    memoria, registros, extra, _ = restaurar_memoria(ruta, max_historial, archivo_historial)
+    tabla_paginas = memoria.tabla_paginas
+    procesos = []
+    with sin_recolector():
+        for proceso_id, (tamano, llegada, vida) in registros.items():
+            proceso = Proceso(proceso_id, tamano, llegada, None if vida == -1 else vida)
+            proceso.paginas = tabla_paginas.get(proceso_id, [])
+            procesos.append(proceso)
+    return memoria, procesos, extra
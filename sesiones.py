@@ -0,0 +1,193 @@
+from contextlib import contextmanager
+import os
+import pickle
+import tempfile
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+# Almacenes de sesiones. Todos ofrecen la misma interfaz, que un cliente de Redis
+# (o similar) puede implementar igual para compartir las sesiones entre servidores:
+#   obtener(clave) -> objeto o None
+#   guardar(clave, objeto)
+#   borrar(clave)
+#   claves()           -> claves guardadas
+#   ultimo_uso(clave)  -> time.time() del último guardado, o None
+#   bloquear(clave)    -> contexto que excluye a cualquier otro que bloquee la misma clave
+#                         (en todos los procesos que compartan el almacén)
+
+# Los cerrojos se reparten por franjas según la clave: su número no crece con las sesiones
+# y nunca hay que borrarlos. Dos sesiones de la misma franja solo se esperan entre sí.
+FRANJAS_CERROJO = 256
+
+
+def franja(clave):
+    # crc32 y no hash(): debe dar lo mismo en todos los procesos servidores
+    return zlib.crc32(clave.encode("utf-8")) % FRANJAS_CERROJO
+
+
+class AlmacenMemoria:
+    # Sesiones en el propio proceso: solo sirve con un único proceso servidor
+    compartido = False
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.objetos = {}  # clave -> (último uso, objeto)
+        self.cerrojos = [threading.Lock() for _ in range(FRANJAS_CERROJO)]
+
+    def bloquear(self, clave):
+        return self.cerrojos[franja(clave)]
+
+    def obtener(self, clave):
+        with self.lock:
+            entrada = self.objetos.get(clave)
+            return entrada[1] if entrada else None
+
+    def guardar(self, clave, objeto):
+        with self.lock:
+            self.objetos[clave] = (time.time(), objeto)
+
+    def borrar(self, clave):
+        with self.lock:
+            self.objetos.pop(clave, None)
+
+    def claves(self):
+        with self.lock:
+            return list(self.objetos)
+
+    def ultimo_uso(self, clave):
+        with self.lock:
+            entrada = self.objetos.get(clave)
+            return entrada[0] if entrada else None
+
+
+class AlmacenDisco:
+    # Un archivo pickle por sesión en un directorio compartido por todos los procesos
+    # servidores. La escritura se hace en un temporal y se renombra, así nunca se lee
+    # un archivo a medias; si dos procesos guardan la misma sesión, gana el último.
+    compartido = True
+
+    def __init__(self, directorio):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.directorio_cerrojos = os.path.join(directorio, ".cerrojos")
+        os.makedirs(self.directorio_cerrojos, exist_ok=True)
+
+    @contextmanager
+    def bloquear(self, clave):
+        # Cerrojo de archivo: excluye también a los hilos del mismo proceso, porque cada
+        # uno abre su propio descriptor
+        self.ruta(clave)  # Valida la clave
+        with open(os.path.join(self.directorio_cerrojos, f"{franja(clave)}.lock"), "a+b") as archivo:
+            if fcntl is not None:
+                fcntl.flock(archivo, fcntl.LOCK_EX)
+            else:
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(archivo, fcntl.LOCK_UN)
+                else:
+                    archivo.seek(0)
+                    msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def ruta(self, clave):
+        if not clave or os.sep in clave or clave.startswith("."):
+            raise ValueError(f"Clave de sesión no válida: {clave!r}")
+        return os.path.join(self.directorio, clave + ".pkl")
+
+    def obtener(self, clave):
+        try:
+            with open(self.ruta(clave), "rb") as archivo:
+                return pickle.load(archivo)
+        except (FileNotFoundError, EOFError):
+            return None
+
+    def guardar(self, clave, objeto):
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                pickle.dump(objeto, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self.ruta(clave))
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    def borrar(self, clave):
+        try:
+            os.unlink(self.ruta(clave))
+        except FileNotFoundError:
+            pass
+
+    def claves(self):
+        return [nombre[:-4] for nombre in os.listdir(self.directorio) if nombre.endswith(".pkl")]
+
+    def ultimo_uso(self, clave):
+        try:
+            return os.path.getmtime(self.ruta(clave))
+        except FileNotFoundError:
+            return None
+
+
+class GestorSesiones:
+    # Una simulación por sesión. crear() construye el estado de una sesión nueva.
+    # Las sesiones sin uso durante más de "inactividad" segundos se desalojan;
+    # la revisión se hace como mucho una vez por "intervalo_revision" segundos.
+    def __init__(self, crear, almacen=None, inactividad=1800, intervalo_revision=60):
+        self.crear = crear
+        self.almacen = AlmacenMemoria() if almacen is None else almacen
+        self.inactividad = inactividad
+        self.intervalo_revision = intervalo_revision
+        self.ultima_revision = time.time()
+        self.lock = threading.Lock()
+
+    def obtener(self, id_sesion):
+        self.revisar()
+        sesion = self.almacen.obtener(id_sesion)
+        if sesion is None:
+            sesion = self.crear()
+            self.almacen.guardar(id_sesion, sesion)
+        return sesion
+
+    def guardar(self, id_sesion, sesion):
+        self.almacen.guardar(id_sesion, sesion)
+
+    @contextmanager
+    def usar(self, id_sesion):
+        # Carga, modificación y guardado de una sesión sin que otra petición se intercale.
+        # Con un almacén en disco cada petición tiene su propia copia de la sesión, así que
+        # sin el cerrojo la que guardase última pisaría los cambios de la otra.
+        with self.almacen.bloquear(id_sesion):
+            sesion = self.obtener(id_sesion)
+            yield sesion
+            self.almacen.guardar(id_sesion, sesion)
+
+    def revisar(self, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        with self.lock:
+            if ahora - self.ultima_revision < self.intervalo_revision:
+                return 0
+            self.ultima_revision = ahora
+        return self.desalojar_inactivas(ahora)
+
+    def desalojar_inactivas(self, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        desalojadas = 0
+        for clave in self.almacen.claves():
+            ultimo_uso = self.almacen.ultimo_uso(clave)
+            if ultimo_uso is not None and ahora - ultimo_uso > self.inactividad:
+                self.almacen.borrar(clave)
+                desalojadas += 1
+        return desalojadas
+
+    def __len__(self):
+        return len(self.almacen.claves())
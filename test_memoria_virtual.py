@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from memoria import Memoria, Proceso
+from memoria_virtual import ALGORITMOS, MemoriaVirtual
+
+
+def fallos(algoritmo, referencias, marcos):
+    virtual = MemoriaVirtual(Memoria(marcos * 4, 4, compacta=True), algoritmo)
+    return virtual.simular(referencias)["fallos"]
+
+
+def test_anomalia_belady():
+    # Con FIFO, la cadena clásica falla más con cuatro marcos que con tres
+    cadena = [(1, pagina) for pagina in (1, 2, 3, 4, 1, 2, 5, 1, 2, 3, 4, 5)]
+    assert fallos("fifo", cadena, 3) == 9
+    assert fallos("fifo", cadena, 4) == 10
+    assert fallos("lru", cadena, 3) == 10
+    assert fallos("lru", cadena, 4) == 8
+    assert fallos("optimo", cadena, 3) == 7
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_optimo_no_supera_a_los_demas(semilla):
+    aleatorio = random.Random(semilla)
+    referencias = [(aleatorio.randrange(3), int(aleatorio.paretovariate(1.2)) % 20, aleatorio.random() < 0.3)
+                   for _ in range(3000)]
+    for marcos in (4, 8, 16):
+        optimo = fallos("optimo", referencias, marcos)
+        for algoritmo in ALGORITMOS:
+            assert optimo <= fallos(algoritmo, referencias, marcos)
+
+
+@pytest.mark.parametrize("algoritmo", ALGORITMOS)
+def test_estadisticas_y_marcos(algoritmo):
+    memoria = Memoria(8 * 4, 4, compacta=True)
+    virtual = MemoriaVirtual(memoria, algoritmo, max_marcos=5)
+    virtual.admitir(Proceso(1, 40))
+    referencias = [(1, pagina % 10, pagina % 3 == 0) for pagina in range(200)]
+    estadisticas = virtual.simular(referencias)
+    assert estadisticas["referencias"] == 200
+    assert estadisticas["aciertos"] + estadisticas["fallos"] == 200
+    assert estadisticas["reemplazos"] == estadisticas["fallos"] - 5
+    assert estadisticas["marcos_usados"] == 5
+    assert sum(proceso_id is not None for proceso_id in memoria.memoria_fisica) == 5
+    assert virtual.terminar_proceso(1) == 5
+    assert all(proceso_id is None for proceso_id in memoria.memoria_fisica)
+
+
+def test_fuera_del_espacio_logico():
+    virtual = MemoriaVirtual(Memoria(16, 4), "lru")
+    virtual.admitir(Proceso(1, 8))
+    with pytest.raises(ValueError):
+        virtual.referenciar(1, 2)
+    assert virtual.fallos == 0
+
+
+def test_optimo_sin_traza():
+    virtual = MemoriaVirtual(Memoria(16, 4), "optimo")
+    with pytest.raises(ValueError, match="simular"):
+        virtual.referenciar(1, 0)
+    assert virtual.referencias == virtual.fallos == 0
+    assert all(proceso_id is None for proceso_id in virtual.memoria.memoria_fisica)
+    # Tras una simulación, una posición fuera de la traza tampoco vale
+    virtual.simular([(1, 0), (1, 1)])
+    with pytest.raises(ValueError):
+        virtual.referenciar(1, 2, posicion=2)
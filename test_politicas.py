@@ -0,0 +1,65 @@
+import random
+
+import pytest
+
+from politicas import POLITICAS, SistemaCompaneros
+
+
+def test_companeros_divide_y_fusiona():
+    companeros = SistemaCompaneros(16)
+    assert companeros.tomar(3) == [0, 1, 2, 3]  # Se redondea a 4: 16 -> 8 + 4 + 4
+    assert [sorted(libres) for libres in companeros.bloques_libres] == [[], [], [4], [8], []]
+    assert companeros.tomar(1) == [4]
+    assert companeros.tomar(2) == [6, 7]
+    assert len(companeros) == 9
+
+    companeros.devolver([0, 1, 2, 3])
+    assert [sorted(libres) for libres in companeros.bloques_libres] == [[5], [], [0], [8], []]
+    companeros.devolver([4])  # 4 y 5 se fusionan, pero 6-7 sigue asignado
+    assert [sorted(libres) for libres in companeros.bloques_libres] == [[], [4], [0], [8], []]
+    companeros.devolver([6, 7])  # Se fusiona todo de nuevo en un bloque de 16
+    assert [sorted(libres) for libres in companeros.bloques_libres] == [[], [], [], [], [0]]
+    assert len(companeros) == 16
+    assert companeros.tomar(17) is None
+
+
+def test_companeros_memoria_no_potencia_de_dos():
+    companeros = SistemaCompaneros(12)
+    assert [sorted(libres) for libres in companeros.bloques_libres] == [[], [], [8], [0]]
+    assert companeros.tomar(8) == list(range(8))
+    assert companeros.tomar(8) is None
+    assert companeros.tomar(4) == [8, 9, 10, 11]
+
+
+@pytest.mark.parametrize("compacta", (False, True))
+@pytest.mark.parametrize("politica", POLITICAS)
+def test_marcos_sin_repetir(politica, compacta):
+    # Ninguna política entrega un marco ocupado y al devolverlo todo vuelve a estar libre
+    aleatorio = random.Random(5)
+    ubicacion = POLITICAS[politica](256, compacta)
+    ocupados = {}
+    for numero in range(2000):
+        if ocupados and aleatorio.random() < 0.45:
+            ubicacion.devolver(ocupados.pop(aleatorio.choice(list(ocupados))))
+            continue
+        marcos = ubicacion.tomar(aleatorio.randint(1, 24))
+        if marcos is None:
+            continue
+        usados = set().union(*ocupados.values())
+        assert not usados & set(marcos)
+        ocupados[numero] = marcos
+        assert len(ubicacion) == 256 - len(usados) - len(marcos)
+    for marcos in ocupados.values():
+        ubicacion.devolver(marcos)
+    assert len(ubicacion) == 256
+    assert len(ubicacion.tomar(256)) == 256
+
+
+@pytest.mark.parametrize("compacta", (False, True))
+@pytest.mark.parametrize("politica", POLITICAS)
+def test_cantidad_no_positiva(politica, compacta):
+    ubicacion = POLITICAS[politica](16, compacta)
+    for cantidad in (0, -1, -5):
+        assert ubicacion.tomar(cantidad) == []
+    assert len(ubicacion) == 16
+    assert ubicacion.tomar(16) is not None
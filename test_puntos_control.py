@@ -0,0 +1,128 @@
+import random
+
+import pytest
+
+from cargas import Carga, Exponencial, LlegadasPoisson, Uniforme
+from memoria import Memoria
+from motor_simulacion import MotorSimulacion, restaurar_motor
+from politicas import POLITICAS
+from puntos_control import PuntosControl, leer, restaurar
+
+
+def estado(motor):
+    # Todo menos las latencias, que cambian de una ejecución a otra
+    memoria = motor.memoria
+    metricas = {campo: valor for campo, valor in vars(memoria.metricas).items()
+                if campo not in ("latencia_acumulada", "histograma_latencias", "ultima")}
+    return (list(memoria.memoria_fisica), {k: list(v) for k, v in memoria.tabla_paginas.items()},
+            memoria.tiempo_actual, metricas, motor.contadores(),
+            sorted((p.id_proceso, p.tamano, p.tiempo_llegada, p.tiempo_vida, list(p.paginas))
+                   for p in motor.procesos.values()))
+
+
+@pytest.mark.parametrize("compacta", (False, True))
+@pytest.mark.parametrize("politica", POLITICAS)
+def test_guardar_restaurar_continuar(tmp_path, politica, compacta):
+    # Restaurar el último punto de una serie y seguir da lo mismo que no haberse detenido
+    eventos = list(Carga(Uniforme(1, 64), Exponencial(30), LlegadasPoisson(2), semilla=1).eventos(1500))
+    eventos += [("eliminar", i) for i in range(1, 1500, 7)]
+    random.Random(2).shuffle(eventos)
+    partes = [eventos[i:i + 300] for i in range(0, len(eventos), 300)]
+
+    continuo = MotorSimulacion(4096, 4, compacta, politica=politica)
+    continuo.ejecutar(eventos)
+    motor = MotorSimulacion(4096, 4, compacta, politica=politica)
+    for numero, parte in enumerate(partes[:3]):
+        motor.ejecutar(parte)
+        assert motor.guardar_punto_control(str(tmp_path / f"pc.{numero}")) == (numero > 0)
+
+    restaurado = restaurar_motor(str(tmp_path / "pc.2"))
+    assert estado(restaurado) == estado(motor)
+    assert vars(restaurado.memoria.metricas) == vars(motor.memoria.metricas)
+    for parte in partes[3:]:
+        restaurado.ejecutar(parte)
+    assert estado(restaurado) == estado(continuo)
+
+
+@pytest.mark.parametrize("politica", POLITICAS)
+def test_bajo_demanda(tmp_path, politica):
+    memoria = Memoria(256, 4, compacta=True, politica=politica)
+    puntos = PuntosControl(memoria)
+    aleatorio = random.Random(3)
+    for numero in range(4):
+        for _ in range(40):
+            ocupados = [marco for marco, proceso_id in enumerate(memoria.memoria_fisica) if proceso_id is not None]
+            operacion = aleatorio.random()
+            if operacion < 0.5 or not ocupados:
+                memoria.tomar_marco(aleatorio.randrange(8), aleatorio.randrange(100))
+            elif operacion < 0.75:
+                memoria.soltar_marco(aleatorio.choice(ocupados))
+            else:
+                memoria.reemplazar_marco(aleatorio.choice(ocupados), aleatorio.randrange(8), aleatorio.randrange(100))
+        puntos.guardar(str(tmp_path / f"pc.{numero}"))
+
+    restaurada, _, _ = restaurar(str(tmp_path / "pc.3"))
+    assert restaurada.tabla_paginas == memoria.tabla_paginas
+    assert list(restaurada.memoria_fisica) == list(memoria.memoria_fisica)
+    for _ in range(30):
+        assert restaurada.tomar_marco(1, 0) == memoria.tomar_marco(1, 0)
+
+
+def test_incremental_solo_lleva_cambios(tmp_path):
+    motor = MotorSimulacion(4096, 4, compacta=True)
+    for proceso_id in range(100):
+        motor.crear_proceso(proceso_id, 16)
+    motor.guardar_punto_control(str(tmp_path / "pc.0"))
+    motor.eliminar_proceso(5)
+    motor.crear_proceso(100, 16)
+    motor.guardar_punto_control(str(tmp_path / "pc.1"))
+
+    punto = leer(str(tmp_path / "pc.1"))
+    assert sorted(punto["tablas"][0::5]) == [5, 100]
+    assert sorted(punto["procesos"][0::4]) == [5, 100]
+    assert list(punto["indices"]) == [20, 21, 22, 23]  # El proceso 100 ocupa los marcos que dejó el 5
+    memoria, procesos, _ = restaurar(str(tmp_path / "pc.1"))
+    assert 5 not in memoria.tabla_paginas and 100 in memoria.tabla_paginas
+    assert len(procesos) == 100
+
+
+def test_errores(tmp_path):
+    vacio = tmp_path / "vacio"
+    vacio.write_bytes(b"")
+    otro = tmp_path / "otro"
+    otro.write_bytes(b"no es un punto de control")
+    for ruta in (vacio, otro):
+        with pytest.raises(ValueError):
+            restaurar(str(ruta))
+
+    memoria = Memoria(64, 4, compacta=True)
+    puntos = PuntosControl(memoria)
+    puntos.guardar(str(tmp_path / "pc.0"))
+    memoria.tomar_marco(1, 0)
+    puntos.guardar(str(tmp_path / "pc.1"))
+    PuntosControl(memoria).guardar(str(tmp_path / "pc.0"))  # Otra serie sustituye a la base
+    with pytest.raises(ValueError):
+        restaurar(str(tmp_path / "pc.1"))
+
+
+def test_serie_larga(tmp_path):
+    # Más incrementales seguidos que el límite de recursión de Python
+    memoria = Memoria(4096, 4, compacta=True)
+    puntos = PuntosControl(memoria, max_incrementales=2000)
+    for numero in range(1100):
+        memoria.tomar_marco(numero % 50, numero)
+        assert puntos.guardar(str(tmp_path / f"pc.{numero}")) == (numero > 0)
+    restaurada, _, _ = restaurar(str(tmp_path / "pc.1099"))
+    assert restaurada.tabla_paginas == memoria.tabla_paginas
+
+
+def test_completo_tras_max_incrementales(tmp_path):
+    memoria = Memoria(256, 4)
+    puntos = PuntosControl(memoria, max_incrementales=3)
+    incrementales = []
+    for numero in range(9):
+        memoria.tomar_marco(1, numero)
+        incrementales.append(puntos.guardar(str(tmp_path / f"pc.{numero}")))
+    assert incrementales == [False, True, True, True, False, True, True, True, False]
+    restaurada, _, _ = restaurar(str(tmp_path / "pc.7"))
+    assert restaurada.tabla_paginas == {1: {marco: marco for marco in range(8)}}
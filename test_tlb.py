@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from memoria import Memoria, Proceso
+from tlb import TLB, TraductorDirecciones
+
+
+def memoria_con_procesos(compacta):
+    memoria = Memoria(1024 * 16, 16, compacta=compacta)
+    for proceso_id, tamano in ((1, 300), (2, 16 * 40), (3, 1000)):
+        memoria.asignar_memoria(Proceso(proceso_id, tamano))
+    return memoria
+
+
+@pytest.mark.parametrize("compacta", (False, True))
+@pytest.mark.parametrize("asid", (False, True))
+def test_lote_igual_que_una_a_una(compacta, asid):
+    # Traducir por lotes da las mismas direcciones y deja la TLB igual que traducir una a una
+    pytest.importorskip("numpy")
+    aleatorio = random.Random(4)
+    rafagas = []
+    for _ in range(60):
+        proceso_id, tamano = aleatorio.choice(((1, 300), (2, 16 * 40), (3, 1000)))
+        inicio = aleatorio.randrange(tamano)
+        rafagas.append((proceso_id, [min(tamano - 1, inicio + aleatorio.randrange(48)) for _ in range(40)]))
+
+    escalar = TraductorDirecciones(memoria_con_procesos(compacta), TLB(8, 2, asid=asid))
+    lote = TraductorDirecciones(memoria_con_procesos(compacta), TLB(8, 2, asid=asid))
+    for proceso_id, direcciones in rafagas:
+        esperado = [escalar.traducir(proceso_id, direccion) for direccion in direcciones]
+        assert lote.traducir_lote(proceso_id, direcciones).tolist() == esperado
+    assert lote.tlb.estadisticas() == escalar.tlb.estadisticas()
+    assert [list(conjunto.items()) for conjunto in lote.tlb.conjuntos] == \
+        [list(conjunto.items()) for conjunto in escalar.tlb.conjuntos]
+
+
+def test_invalida_marcos_reasignados():
+    memoria = Memoria(64, 4)
+    memoria.asignar_memoria(Proceso(1, 8))
+    with TraductorDirecciones(memoria, TLB(4)) as traductor:
+        assert traductor.traducir(1, 5) == 5
+        memoria.desasignar_memoria(Proceso(1, 8))
+        memoria.asignar_memoria(Proceso(2, 16))
+        memoria.asignar_memoria(Proceso(1, 8))
+        assert traductor.traducir(1, 5) == memoria.traducir(1, 5) == 21
+        assert traductor.tlb.fallos == 2
+    assert not memoria.rastreadores
+    with pytest.raises(ValueError):
+        traductor.traducir(1, 5)
+
+
+def test_tlb_conjuntos():
+    with pytest.raises(ValueError):
+        TLB(6, 4)
+    tlb = TLB(4, 2)
+    for pagina in (0, 2, 4):  # Las tres caen en el conjunto 0
+        tlb.insertar(1, pagina, pagina)
+    assert tlb.buscar(1, 0) is None
+    assert tlb.buscar(1, 4) == 4
+    tlb.cambiar_contexto(2)
+    assert tlb.buscar(1, 4) == 4  # Con ASID no se vacía al cambiar de proceso
+    assert tlb.vaciados == 0
@@ -0,0 +1,181 @@
+from collections import OrderedDict
+import random
+
+try:
+    import numpy as np
+except ImportError:  # La traducción por lotes funciona también sin NumPy, pero más lenta
+    np = None
+
+
+class TLB:
+    # Caché de traducciones (ID, página) -> marco, asociativa por conjuntos.
+    # asociatividad=None la hace totalmente asociativa. Con asid=False no se etiquetan
+    # las entradas con el proceso y la TLB se vacía en cada cambio de contexto.
+    def __init__(self, entradas=16, asociatividad=None, reemplazo="lru", asid=True,
+                 tiempo_tlb=20.0, tiempo_memoria=100.0, semilla=None):
+        asociatividad = entradas if asociatividad is None else asociatividad
+        if entradas <= 0 or asociatividad <= 0 or entradas % asociatividad:
+            raise ValueError("El número de entradas de la TLB debe ser múltiplo de la asociatividad.")
+        if reemplazo not in ("lru", "aleatorio"):
+            raise ValueError(f"Reemplazo de TLB desconocido: {reemplazo}")
+        self.entradas = entradas
+        self.asociatividad = asociatividad
+        self.reemplazo = reemplazo
+        self.asid = asid
+        self.tiempo_tlb = tiempo_tlb  # ns por consulta a la TLB
+        self.tiempo_memoria = tiempo_memoria  # ns por acceso a memoria
+        self.conjuntos = [OrderedDict() for _ in range(entradas // asociatividad)]
+        self.aleatorio = random.Random(semilla)
+        self.proceso_actual = None
+        self.aciertos = 0
+        self.fallos = 0
+        self.vaciados = 0
+
+    def cambiar_contexto(self, proceso_id):
+        if proceso_id != self.proceso_actual:
+            if not self.asid and self.proceso_actual is not None:
+                self.vaciar()
+            self.proceso_actual = proceso_id
+
+    def vaciar(self):
+        for conjunto in self.conjuntos:
+            conjunto.clear()
+        self.vaciados += 1
+
+    def invalidar_marcos(self, marcos):
+        # Quita las entradas que apuntan a estos marcos (liberados o reasignados)
+        for conjunto in self.conjuntos:
+            for clave in [clave for clave, marco in conjunto.items() if marco in marcos]:
+                del conjunto[clave]
+
+    def invalidar(self, proceso_id):
+        # Quita las entradas de un proceso, por ejemplo cuando se libera su memoria
+        for conjunto in self.conjuntos:
+            for clave in [clave for clave in conjunto if clave[0] == proceso_id]:
+                del conjunto[clave]
+
+    def buscar(self, proceso_id, pagina):
+        conjunto = self.conjuntos[pagina % len(self.conjuntos)]
+        clave = (proceso_id, pagina)
+        marco = conjunto.get(clave)
+        if marco is None:
+            self.fallos += 1
+            return None
+        if self.reemplazo == "lru":
+            conjunto.move_to_end(clave)
+        self.aciertos += 1
+        return marco
+
+    def insertar(self, proceso_id, pagina, marco):
+        conjunto = self.conjuntos[pagina % len(self.conjuntos)]
+        if len(conjunto) >= self.asociatividad:
+            if self.reemplazo == "lru":
+                conjunto.popitem(last=False)
+            else:
+                del conjunto[self.aleatorio.choice(list(conjunto))]
+        conjunto[(proceso_id, pagina)] = marco
+
+    def tiempo_efectivo(self):
+        # Tiempo efectivo de acceso: en un acierto basta un acceso a memoria; en un
+        # fallo hay que leer además la tabla de páginas (un nivel)
+        consultas = self.aciertos + self.fallos
+        if not consultas:
+            return 0.0
+        tasa_aciertos = self.aciertos / consultas
+        return (tasa_aciertos * (self.tiempo_tlb + self.tiempo_memoria)
+                + (1 - tasa_aciertos) * (self.tiempo_tlb + 2 * self.tiempo_memoria))
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            "vaciados": self.vaciados,
+            "tiempo_efectivo_ns": self.tiempo_efectivo(),
+        }
+
+
+class TraductorDirecciones:
+    # Traducción de direcciones lógicas a físicas con una TLB (opcional) delante
+    # de la tabla de páginas de una Memoria. Las entradas de la TLB que apuntan a marcos
+    # que cambiaron de dueño desde la última traducción se invalidan antes de consultarla.
+    # Para dejar de seguir los cambios de la memoria hay que llamar a cerrar() o usarlo con "with".
+    def __init__(self, memoria, tlb=None):
+        self.memoria = memoria
+        self.tlb = tlb
+        self.cambios = memoria.nuevo_rastreador() if tlb is not None else None
+        if self.cambios is not None:
+            self.cambios.consumir()
+        self.cerrado = False
+
+    def cerrar(self):
+        # Las estadísticas de la TLB se pueden seguir leyendo, pero ya no se traduce
+        if self.cambios is not None:
+            self.memoria.quitar_rastreador(self.cambios)
+            self.cambios = None
+        self.cerrado = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        self.cerrar()
+
+    def sincronizar(self):
+        if self.cerrado:
+            raise ValueError("El traductor de direcciones está cerrado.")
+        cambios = self.cambios
+        if cambios.completo:
+            self.tlb.vaciar()
+        elif cambios.marcos:
+            self.tlb.invalidar_marcos(cambios.marcos)
+        else:
+            return
+        cambios.consumir()
+
+    def traducir(self, proceso_id, direccion_logica):
+        if self.tlb is None:
+            if self.cerrado:
+                raise ValueError("El traductor de direcciones está cerrado.")
+            return self.memoria.traducir(proceso_id, direccion_logica)
+        self.sincronizar()
+        self.tlb.cambiar_contexto(proceso_id)
+        pagina, desplazamiento = divmod(direccion_logica, self.memoria.tamano_pagina)
+        marco = self.tlb.buscar(proceso_id, pagina)
+        if marco is None:
+            direccion_fisica = self.memoria.traducir(proceso_id, direccion_logica)
+            self.tlb.insertar(proceso_id, pagina, direccion_fisica // self.memoria.tamano_pagina)
+            return direccion_fisica
+        return marco * self.memoria.tamano_pagina + desplazamiento
+
+    def traducir_lote(self, proceso_id, direcciones):
+        # Traduce un array de direcciones de un proceso. La traducción se vectoriza con
+        # NumPy; la TLB solo se simula en los cambios de página, porque las referencias
+        # seguidas a la misma página son siempre aciertos y no alteran su estado.
+        if np is None:
+            return [self.traducir(proceso_id, direccion) for direccion in direcciones]
+
+        tamano_pagina = self.memoria.tamano_pagina
+        direcciones = np.asarray(direcciones, dtype=np.int64)
+        tabla = self.memoria.tabla_paginas.get(proceso_id)
+        if tabla is None or isinstance(tabla, dict):
+            raise ValueError(f"El proceso {proceso_id} no tiene una tabla de páginas contigua.")
+        tabla = np.frombuffer(tabla, dtype=np.int32) if self.memoria.compacta else np.asarray(tabla, dtype=np.int64)
+        paginas = direcciones // tamano_pagina
+        if len(paginas) and (paginas.min() < 0 or paginas.max() >= len(tabla)):
+            raise ValueError(f"Hay direcciones fuera del espacio lógico del proceso {proceso_id}.")
+        fisicas = tabla[paginas].astype(np.int64) * tamano_pagina + direcciones % tamano_pagina
+
+        if self.tlb is not None and len(paginas):
+            self.sincronizar()
+            self.tlb.cambiar_contexto(proceso_id)
+            cambios = np.flatnonzero(paginas[1:] != paginas[:-1]) + 1
+            self.tlb.aciertos += len(paginas) - 1 - len(cambios)
+            paginas_distintas = paginas[np.concatenate(([0], cambios))]
+            buscar = self.tlb.buscar
+            insertar = self.tlb.insertar
+            for pagina, marco in zip(paginas_distintas.tolist(), tabla[paginas_distintas].tolist()):
+                if buscar(proceso_id, pagina) is None:
+                    insertar(proceso_id, pagina, marco)
+        return fisicas